@@ -1,18 +1,46 @@
 """Photo Critic - AI-powered batch photo criticism using vision APIs."""
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 __author__ = "Michael Colenso"
 __email__ = "github@michaelcolenso.com"
 
-from photo_critic.batch import (
-    BatchClient,
-    OpenAIBatchClient,
-    poll_batch,
-    submit_batch,
-)
-from photo_critic.discovery import discover_images
-from photo_critic.prepare import prepare_batch, preprocess_image
-from photo_critic.report import generate_report
+if TYPE_CHECKING:
+    from photo_critic.batch import (
+        BatchClient,
+        OpenAIBatchClient,
+        poll_batch,
+        submit_batch,
+    )
+    from photo_critic.discovery import discover_images
+    from photo_critic.prepare import prepare_batch, preprocess_image
+    from photo_critic.report import generate_report
+
+# Public names and the module defining each. They are imported on first
+# access, so importing the package (e.g. for the CLI's --help) doesn't load
+# the OpenAI SDK or Pillow until they are needed.
+_LAZY_EXPORTS = {
+    "discover_images": "photo_critic.discovery",
+    "preprocess_image": "photo_critic.prepare",
+    "prepare_batch": "photo_critic.prepare",
+    "submit_batch": "photo_critic.batch",
+    "poll_batch": "photo_critic.batch",
+    "generate_report": "photo_critic.report",
+    "BatchClient": "photo_critic.batch",
+    "OpenAIBatchClient": "photo_critic.batch",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "discover_images",
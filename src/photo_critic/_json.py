@@ -0,0 +1,76 @@
+"""JSON helpers that use orjson when installed and fall back to the stdlib."""
+
+import json
+from typing import Any
+
+# orjson support (faster C/Rust serializer)
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_dumps(obj: Any, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """Serialize an object to UTF-8 encoded JSON.
+
+    Args:
+        obj: JSON-serializable object
+        sort_keys: Emit dictionary keys in sorted order (canonical form)
+        indent: Pretty-print with two-space indentation (for files meant to
+            be read by people)
+
+    Returns:
+        UTF-8 encoded JSON bytes, compact unless indent is set
+    """
+    if ORJSON_AVAILABLE:
+        option = 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option or None)
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=(",", ": ") if indent else (",", ":"),
+        ensure_ascii=False,
+        sort_keys=sort_keys,
+    ).encode("utf-8")
+
+
+def json_dumps_line(obj: Any) -> bytes:
+    """Serialize an object as one newline-terminated JSONL line.
+
+    With orjson the newline is appended by the encoder, so each line is
+    produced as a single bytes object without an extra concatenation.
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        UTF-8 encoded JSON bytes ending in a newline
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json_dumps(obj) + b"\n"
+
+
+def json_loads(data: bytes | bytearray | memoryview | str) -> Any:
+    """Deserialize JSON from bytes or str.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Parsed Python object
+
+    Raises:
+        ValueError: If data is not valid JSON
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
@@ -1,17 +1,93 @@
 """Batch API clients for submitting and polling batch requests."""
 
-import json
+import asyncio
+import copy
 import logging
 import os
+import random
 import tempfile
+import threading
 import time
-from typing import Any
+import uuid
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import IO, Any, Protocol
 
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+from photo_critic._json import json_dumps_line, json_loads
+from photo_critic.cache import ResultCache
 
 logger = logging.getLogger(__name__)
 
+# Read .env once at import; callers that change it at runtime can call
+# load_dotenv(override=True) themselves before creating a client
+load_dotenv()
+
+# Clock and sleep used by polling and rate limiting; tests swap these rather
+# than patching the process-wide time module
+_monotonic = time.monotonic
+_sleep = time.sleep
+
+# Upper bound on the delay between status checks while polling (seconds)
+MAX_POLL_INTERVAL = 300
+
+# Delay before the second status check (seconds); small batches often
+# finish within seconds, so the full poll interval only applies after it
+FIRST_POLL_DELAY = 5
+
+# Seconds of waiting between progress log lines while polling
+PROGRESS_LOG_INTERVAL = 300
+
+# OpenAI batch statuses that can no longer change ("cancelled" is the API
+# spelling, "canceled" is kept for older responses)
+OPENAI_FAILED_STATUSES = {"failed", "expired", "cancelled", "canceled"}
+OPENAI_TERMINAL_STATUSES = {"completed"} | OPENAI_FAILED_STATUSES
+
+# Most terminal statuses kept per client; the oldest are evicted first
+TERMINAL_STATUS_CACHE_SIZE = 1024
+
+# Default number of requests per sub-batch for submit_batches()
+SUB_BATCH_SIZE = 10000
+
+# Hard cap on concurrent uploads to avoid provider rate-limit backlash
+MAX_SUBMIT_CONCURRENCY = 64
+
+# Default client-side request budget for OpenAI API calls (requests per minute)
+DEFAULT_RPM = 500
+
+# Webhook events OpenAI sends when a batch reaches a terminal state
+OPENAI_BATCH_WEBHOOK_EVENTS = {
+    "batch.completed",
+    "batch.failed",
+    "batch.expired",
+    "batch.cancelled",
+}
+
+# Local port for the webhook receiver used by wait_for_batch(via="webhook")
+DEFAULT_WEBHOOK_PORT = 8765
+
+# While waiting on a webhook, check status this often in case a delivery
+# was missed (seconds); matches the slowest polling cadence
+WEBHOOK_FALLBACK_INTERVAL = MAX_POLL_INTERVAL
+
+# Prefix for local batch IDs whose results were all served from the cache
+CACHED_BATCH_PREFIX = "cached_"
+
+# Fresh results are written to the result cache in transactions of this size
+CACHE_WRITE_BATCH_SIZE = 1000
+
+# Batch payloads larger than this are spooled to disk instead of memory (64MB)
+UPLOAD_SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+# Largest batch input file OpenAI accepts (200MB)
+OPENAI_MAX_FILE_BYTES = 200 * 1024 * 1024
+
+# Keys every batch request line must have
+REQUIRED_REQUEST_KEYS = frozenset({"custom_id", "method", "url", "body"})
+
 
 def _get_value(obj: Any, key: str, default: Any = None) -> Any:
     if isinstance(obj, dict):
@@ -19,33 +95,357 @@ def _get_value(obj: Any, key: str, default: Any = None) -> Any:
     return getattr(obj, key, default)
 
 
-def _read_binary_response(content: Any) -> str:
+def _iter_response_lines(content: Any) -> Iterator[str]:
+    """Yield decoded lines from a file content response without buffering it."""
+    if hasattr(content, "iter_lines"):
+        for line in content.iter_lines():
+            yield line.decode("utf-8") if isinstance(line, bytes) else line
+        return
+
     if hasattr(content, "read"):
         data = content.read()
-    elif isinstance(content, (bytes, bytearray)):
-        data = content
     else:
         data = getattr(content, "content", content)
-    if isinstance(data, str):
-        return data
-    return data.decode("utf-8")
+    if not isinstance(data, str):
+        data = data.decode("utf-8")
+    yield from data.splitlines()
+
+
+def _parse_openai_record(record: dict[str, Any]) -> dict[str, Any]:
+    """Convert one OpenAI batch output record into the shared result shape."""
+    custom_id = record.get("custom_id", "unknown")
+    response = record.get("response") or {}
+    status_code = response.get("status_code")
+    if status_code == 200:
+        body = response.get("body", {})
+        text_content = _extract_openai_text(body)
+        result_obj = {
+            "type": "succeeded" if text_content else "errored",
+            "message": {"content": [{"type": "text", "text": text_content or ""}]},
+        }
+    else:
+        error_detail = record.get("error") or response.get("body")
+        result_obj = {
+            "type": "errored",
+            "error": error_detail,
+        }
+
+    return {"custom_id": custom_id, "result": result_obj}
+
+
+def _validate_requests(requests: list[dict[str, Any]]) -> None:
+    """Check that every request has the required keys and a unique custom_id.
+
+    Runs before anything is uploaded so a malformed request fails fast
+    instead of after the provider has received the whole file.
+
+    Raises:
+        ValueError: If a request is missing keys or reuses a custom_id
+    """
+    seen: set[str] = set()
+    for index, request in enumerate(requests):
+        missing = REQUIRED_REQUEST_KEYS - request.keys()
+        if missing:
+            raise ValueError(f"requests[{index}] missing {', '.join(sorted(missing))}")
+        custom_id = request["custom_id"]
+        if custom_id in seen:
+            raise ValueError(f"requests[{index}] has duplicate custom_id: {custom_id}")
+        seen.add(custom_id)
+
+
+def _write_jsonl(requests: list[dict[str, Any]]) -> IO[bytes]:
+    """Write requests as JSONL into a spooled file positioned at the start.
+
+    The payload stays in memory up to UPLOAD_SPOOL_MAX_BYTES and only very
+    large batches spill over to a temporary file. The caller must close
+    the returned file.
+
+    Raises:
+        ValueError: If the payload exceeds OPENAI_MAX_FILE_BYTES
+    """
+    payload = tempfile.SpooledTemporaryFile(  # noqa: SIM115
+        max_size=UPLOAD_SPOOL_MAX_BYTES
+    )
+    try:
+        size = 0
+        for count, request in enumerate(requests):
+            line = json_dumps_line(request)
+            size += len(line)
+            if size > OPENAI_MAX_FILE_BYTES:
+                raise ValueError(
+                    f"Batch file too large: over {OPENAI_MAX_FILE_BYTES} bytes "
+                    f"after {count} requests"
+                )
+            payload.write(line)
+        payload.seek(0)
+    except BaseException:
+        payload.close()
+        raise
+    return payload
+
+
+@contextmanager
+def _spool_jsonl(requests: list[dict[str, Any]]) -> Iterator[IO[bytes]]:
+    """Context manager around _write_jsonl() that closes the payload."""
+    with _write_jsonl(requests) as payload:
+        yield payload
+
+
+def _next_delay(attempt: int, base: float, cap: float = MAX_POLL_INTERVAL) -> float:
+    """Compute the next polling delay using capped exponential backoff with jitter.
+
+    Args:
+        attempt: Number of consecutive polls without a status change
+        base: Base delay in seconds (the caller's poll_interval)
+        cap: Maximum delay in seconds before jitter is applied
+
+    Returns:
+        Delay in seconds, between half and the full capped backoff value
+    """
+    delay = min(cap, base * (2**attempt))
+    return float(delay * (0.5 + random.random() * 0.5))
 
 
 def _extract_openai_text(body: dict[str, Any]) -> str | None:
-    choices = body.get("choices", [])
+    choices = body.get("choices")
     if not choices:
         return None
-    message = choices[0].get("message", {})
-    content = message.get("content")
-    if isinstance(content, str):
+    content = choices[0].get("message", {}).get("content")
+    # Parsed JSON never yields str/list subclasses, so exact type checks are
+    # safe and skip the isinstance() overhead on this per-record path.
+    content_type = type(content)
+    if content_type is str:
         return content
-    if isinstance(content, list):
+    if content_type is list:
         for part in content:
-            if isinstance(part, dict) and part.get("type") == "text":
+            if type(part) is dict and part.get("type") == "text":
                 return part.get("text")
     return None
 
 
+class _BatchStatusSource(Protocol):
+    """Anything _poll() can query for batch status (both provider clients)."""
+
+    def get_batch_status(self, batch_id: str) -> dict[str, Any]: ...
+
+
+def _poll(
+    source: _BatchStatusSource,
+    batch_id: str,
+    *,
+    state_key: str,
+    done_states: set[str],
+    failed_states: set[str],
+    poll_interval: float,
+    timeout: int,
+    max_interval: float = MAX_POLL_INTERVAL,
+) -> dict[str, Any]:
+    """Poll a batch until it reaches a done or failed state.
+
+    Shared by the provider clients, which differ only in which status field
+    holds the batch state and which states are terminal.
+
+    Args:
+        source: Client providing get_batch_status()
+        batch_id: Batch ID to poll
+        state_key: Status dictionary key holding the batch state
+        done_states: States meaning the batch finished and has results
+        failed_states: States meaning the batch will never finish
+        poll_interval: Base seconds between status checks (backs off
+            exponentially while the state is unchanged); the second check
+            comes after at most FIRST_POLL_DELAY seconds
+        timeout: Maximum seconds to wait, measured on the monotonic clock
+            so wall-clock adjustments don't affect it
+        max_interval: Upper bound for the backoff between checks (equal to
+            poll_interval for a fixed cadence)
+
+    Returns:
+        Final batch status dictionary
+
+    Raises:
+        TimeoutError: If batch doesn't complete within timeout
+        Exception: If batch fails or API call fails
+    """
+    logger.info(f"Polling batch {batch_id} (interval={poll_interval}s)")
+
+    start_time = _monotonic()
+    since_last_log = 0.0
+    attempt = 0
+    last_state = None
+    first_check = True
+
+    while True:
+        status = source.get_batch_status(batch_id)
+        state = status.get(state_key)
+        counts = status["request_counts"]
+
+        # Log progress once PROGRESS_LOG_INTERVAL seconds have been spent
+        # waiting; sleeps are tracked, so no extra clock reads are needed
+        if since_last_log >= PROGRESS_LOG_INTERVAL:
+            logger.info(
+                f"Batch progress: "
+                f"{counts['succeeded']} succeeded, "
+                f"{counts['processing']} processing, "
+                f"{counts['errored']} errored"
+            )
+            since_last_log = 0.0
+
+        if state in done_states:
+            logger.info(
+                f"Batch completed: "
+                f"{counts['succeeded']} succeeded, "
+                f"{counts['errored']} errored, "
+                f"{counts['expired']} expired, "
+                f"{counts['canceled']} canceled"
+            )
+            return status
+
+        if state in failed_states:
+            raise Exception(f"Batch {batch_id} failed with status: {state}")
+
+        # Back off while the state is unchanged, reset on transitions
+        attempt = attempt + 1 if state == last_state else 0
+        last_state = state
+
+        # Check timeout, never sleeping past the deadline so the last
+        # status check happens right at it
+        remaining = timeout - (_monotonic() - start_time)
+        if remaining <= 0:
+            raise TimeoutError(f"Batch {batch_id} did not complete within {timeout}s")
+
+        if first_check:
+            delay = min(FIRST_POLL_DELAY, poll_interval, remaining)
+            first_check = False
+        else:
+            delay = _next_delay(attempt, base=poll_interval, cap=max_interval)
+            delay = min(delay, remaining)
+        logger.debug(f"Batch still processing ({state}), waiting {delay:.1f}s...")
+        _sleep(delay)
+        since_last_log += delay
+
+
+class _TokenBucket:
+    """Token-bucket rate limiter refilling at ``rpm / 60`` tokens per second.
+
+    Shared by the sync and async code paths of a client so both draw from
+    the same request budget.
+    """
+
+    def __init__(self, rpm: int = DEFAULT_RPM) -> None:
+        if rpm < 1:
+            raise ValueError(f"rpm must be positive: {rpm}")
+        self.rpm = rpm
+        self.request_tokens = float(rpm)
+        self.last_update = _monotonic()
+        self._lock = threading.Lock()
+        self._async_lock: asyncio.Lock | None = None
+        self._async_lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def _try_take(self) -> float:
+        """Take a token if one is available.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        with self._lock:
+            now = _monotonic()
+            elapsed = max(0.0, now - self.last_update)
+            self.request_tokens = min(
+                self.rpm, self.request_tokens + elapsed * self.rpm / 60
+            )
+            self.last_update = now
+
+            if self.request_tokens >= 1:
+                self.request_tokens -= 1
+                return 0.0
+            return (1 - self.request_tokens) * 60 / self.rpm
+
+    def acquire(self) -> None:
+        """Take one token, blocking until one is available."""
+        while (wait := self._try_take()) > 0:
+            logger.debug(f"Rate limit reached, waiting {wait:.2f}s")
+            _sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Take one token, awaiting until one is available."""
+        loop = asyncio.get_running_loop()
+        if self._async_lock is None or self._async_lock_loop is not loop:
+            self._async_lock = asyncio.Lock()
+            self._async_lock_loop = loop
+
+        async with self._async_lock:
+            while (wait := self._try_take()) > 0:
+                logger.debug(f"Rate limit reached, waiting {wait:.2f}s")
+                await asyncio.sleep(wait)
+
+
+class _BatchWebhookReceiver:
+    """Minimal HTTP server that waits for a batch's terminal webhook event.
+
+    Every POST is verified with ``unwrap`` (the SDK's signature check);
+    events for other batches are acknowledged and ignored.
+    """
+
+    def __init__(
+        self,
+        batch_id: str,
+        unwrap: Callable[[bytes, dict[str, str]], Any],
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_WEBHOOK_PORT,
+    ) -> None:
+        self.batch_id = batch_id
+        self.event_type: str | None = None
+        self._done = threading.Event()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                try:
+                    event = unwrap(body, dict(self.headers.items()))
+                except Exception as e:
+                    logger.warning(f"Rejected webhook delivery: {e}")
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+
+                receiver._handle(event)
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(f"Webhook receiver: {format % args}")
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="batch-webhook", daemon=True
+        )
+
+    def _handle(self, event: Any) -> None:
+        event_type = _get_value(event, "type")
+        if event_type not in OPENAI_BATCH_WEBHOOK_EVENTS:
+            return
+        if _get_value(_get_value(event, "data"), "id") != self.batch_id:
+            return
+        logger.info(f"Received {event_type} webhook for batch {self.batch_id}")
+        self.event_type = event_type
+        self._done.set()
+
+    def __enter__(self) -> "_BatchWebhookReceiver":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the batch's terminal event arrives or timeout passes."""
+        return self._done.wait(timeout)
+
+
 class AnthropicBatchClient:
     """Client for interacting with Anthropic's Message Batches API."""
 
@@ -135,15 +535,19 @@ class AnthropicBatchClient:
     def poll_batch(
         self,
         batch_id: str,
-        poll_interval: int = 30,
+        poll_interval: float = 30,
         timeout: int = 86400,  # 24 hours
+        max_interval: float = MAX_POLL_INTERVAL,
     ) -> dict[str, Any]:
         """Poll batch until completion.
 
         Args:
             batch_id: Batch ID to poll
-            poll_interval: Seconds between status checks
-            timeout: Maximum seconds to wait
+            poll_interval: Base seconds between status checks (backs off
+                exponentially while the status is unchanged)
+            timeout: Maximum seconds to wait, measured on the monotonic
+                clock so wall-clock adjustments don't affect it
+            max_interval: Upper bound in seconds for the backoff
 
         Returns:
             Final batch status dictionary
@@ -152,59 +556,26 @@ class AnthropicBatchClient:
             TimeoutError: If batch doesn't complete within timeout
             Exception: If batch fails or API call fails
         """
-        logger.info(f"Polling batch {batch_id} (interval={poll_interval}s)")
-
-        start_time = time.time()
-        last_log_time = start_time
-
-        while True:
-            # Check timeout
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
-                raise TimeoutError(
-                    f"Batch {batch_id} did not complete within {timeout}s"
-                )
-
-            # Get status
-            status = self.get_batch_status(batch_id)
-            processing_status = status["processing_status"]
-
-            # Log progress periodically (every 5 minutes)
-            if time.time() - last_log_time >= 300:
-                counts = status["request_counts"]
-                logger.info(
-                    f"Batch progress: "
-                    f"{counts['succeeded']} succeeded, "
-                    f"{counts['processing']} processing, "
-                    f"{counts['errored']} errored"
-                )
-                last_log_time = time.time()
-
-            # Check if ended
-            if processing_status == "ended":
-                counts = status["request_counts"]
-                logger.info(
-                    f"Batch completed: "
-                    f"{counts['succeeded']} succeeded, "
-                    f"{counts['errored']} errored, "
-                    f"{counts['expired']} expired, "
-                    f"{counts['canceled']} canceled"
-                )
-                return status
-
-            # Check for other terminal states
-            if processing_status in {"canceling", "canceled"}:
-                raise Exception(f"Batch was canceled: {batch_id}")
-
-            # Wait before next poll
-            logger.debug(f"Batch still processing, waiting {poll_interval}s...")
-            time.sleep(poll_interval)
+        return _poll(
+            self,
+            batch_id,
+            state_key="processing_status",
+            done_states={"ended"},
+            failed_states={"canceling", "canceled"},
+            poll_interval=poll_interval,
+            timeout=timeout,
+            max_interval=max_interval,
+        )
 
-    def get_batch_results(self, batch_id: str) -> list[dict[str, Any]]:
+    def get_batch_results(
+        self, batch_id: str, status: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
         """Retrieve results from completed batch.
 
         Args:
             batch_id: Batch ID of completed batch
+            status: Final status from poll_batch(), if the caller has it;
+                otherwise the status is fetched
 
         Returns:
             List of result dictionaries
@@ -216,8 +587,9 @@ class AnthropicBatchClient:
         logger.info(f"Retrieving results for batch {batch_id}")
 
         try:
-            # Get batch status first
-            status = self.get_batch_status(batch_id)
+            # Get batch status first, unless the caller already has it
+            if status is None:
+                status = self.get_batch_status(batch_id)
 
             if status["processing_status"] != "ended":
                 raise ValueError(f"Batch not completed: {status['processing_status']}")
@@ -248,6 +620,8 @@ class OpenAIBatchClient:
         api_key: str | None = None,
         endpoint: str = "/v1/chat/completions",
         completion_window: str = "24h",
+        rpm: int = DEFAULT_RPM,
+        cache: ResultCache | None = None,
     ) -> None:
         """Initialize batch client.
 
@@ -255,11 +629,13 @@ class OpenAIBatchClient:
             api_key: OpenAI API key (defaults to OPENAI_API_KEY env var)
             endpoint: Batch endpoint to target
             completion_window: OpenAI completion window
+            rpm: Maximum API requests per minute issued by this client
+            cache: Optional result cache; requests with a cached response
+                are not resubmitted
 
         Raises:
             ValueError: If API key is not provided or found in environment
         """
-        load_dotenv()
         if api_key is None:
             api_key = os.environ.get("OPENAI_API_KEY")
 
@@ -270,39 +646,56 @@ class OpenAIBatchClient:
             )
 
         self.client = OpenAI(api_key=api_key)
+        self._api_key = api_key
+        self._bucket = _TokenBucket(rpm)
         self.endpoint = endpoint
         self.completion_window = completion_window
+        self._terminal_cache: dict[str, dict[str, Any]] = {}
+        self._status_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        self.cache = cache
         logger.info("OpenAI batch client initialized")
 
     def submit_batch(self, requests: list[dict[str, Any]]) -> str:
         """Submit batch of requests to OpenAI API.
 
+        With a result cache, only requests without a cached response are
+        uploaded. The batch's makeup is recorded in the cache, so any client
+        opened on the same cache returns the cached responses alongside the
+        fresh ones from iter_batch_results(). If every request is cached no
+        batch is created and a local ID starting with CACHED_BATCH_PREFIX
+        is returned.
+
         Args:
             requests: List of batch request dictionaries
 
         Returns:
             Batch ID for polling
+
+        Raises:
+            ValueError: If requests is empty, malformed, or too large to
+                upload (checked before anything is sent)
         """
         if not requests:
             raise ValueError("Cannot submit empty batch")
+        _validate_requests(requests)
+
+        requests, record = self._partition_cached(requests)
+        if not requests:
+            batch_id = f"{CACHED_BATCH_PREFIX}{uuid.uuid4().hex}"
+            record(batch_id)
+            logger.info(f"All requests served from cache: {batch_id}")
+            return batch_id
 
         logger.info(f"Submitting OpenAI batch with {len(requests)} requests")
-        temp_path = None
 
         try:
-            with tempfile.NamedTemporaryFile(
-                "w", suffix=".jsonl", delete=False, encoding="utf-8"
-            ) as handle:
-                for request in requests:
-                    handle.write(json.dumps(request))
-                    handle.write("\n")
-                temp_path = handle.name
-
-            with open(temp_path, "rb") as handle:
+            with _spool_jsonl(requests) as payload:
+                self._bucket.acquire()
                 input_file = self.client.files.create(
-                    file=handle, purpose="batch"
+                    file=("batch.jsonl", payload), purpose="batch"
                 )
 
+            self._bucket.acquire()
             batch = self.client.batches.create(
                 input_file_id=input_file.id,
                 endpoint=self.endpoint,
@@ -312,29 +705,186 @@ class OpenAIBatchClient:
             logger.info(f"Batch submitted successfully: {batch.id}")
             logger.info(f"Processing status: {batch.status}")
 
+            record(batch.id)
             return batch.id
 
         except Exception as e:
             logger.error(f"Failed to submit OpenAI batch: {e}")
             raise
 
-        finally:
-            if temp_path:
-                try:
-                    os.unlink(temp_path)
-                except OSError as e:
-                    logger.warning(f"Failed to remove temp file {temp_path}: {e}")
+    def _partition_cached(
+        self, requests: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], Callable[..., None]]:
+        """Drop requests with cached responses.
 
-    def get_batch_status(self, batch_id: str) -> dict[str, Any]:
+        Returns:
+            Tuple of (requests to submit, callback ``record(batch_id,
+            submitted=None, with_hits=True)`` storing which requests make up
+            a batch; ``submitted`` defaults to all the requests to submit and
+            ``with_hits`` attaches the cached responses to that batch)
+        """
+        cache = self.cache
+        if cache is None or cache.policy == "disabled":
+            return requests, lambda *args, **kwargs: None
+
+        hits, misses, keys = cache.partition(requests)
+        cached_ids = {hit["custom_id"] for hit in hits}
+
+        def record(
+            batch_id: str,
+            submitted: list[dict[str, Any]] | None = None,
+            with_hits: bool = True,
+        ) -> None:
+            ids = [r["custom_id"] for r in (misses if submitted is None else submitted)]
+            if with_hits:
+                ids.extend(cached_ids)
+            cache.record_batch(
+                batch_id,
+                {custom_id: keys[custom_id] for custom_id in ids},
+                cached_ids if with_hits else set(),
+            )
+
+        return misses, record
+
+    def _load_cached_batch(
+        self, batch_id: str
+    ) -> tuple[list[dict[str, Any]], dict[str, str]]:
+        """Return (cached results, custom_id -> key of submitted requests)."""
+        recorded = self.cache.load_batch(batch_id) if self.cache else None
+        if recorded is None:
+            if batch_id.startswith(CACHED_BATCH_PREFIX):
+                raise ValueError(
+                    f"Batch {batch_id} was served from a result cache that is "
+                    "not available to this client"
+                )
+            return [], {}
+        return recorded
+
+    def _make_async_client(self) -> AsyncOpenAI:
+        """Create an async client for one submit_batches() call."""
+        return AsyncOpenAI(api_key=self._api_key)
+
+    async def submit_batches(
+        self,
+        requests: list[dict[str, Any]],
+        chunk_size: int = SUB_BATCH_SIZE,
+        concurrency: int = 8,
+    ) -> list[str]:
+        """Split requests into sub-batches and submit them concurrently.
+
+        Uploads share a single AsyncOpenAI client (and connection pool) for
+        the duration of the call, and at most ``concurrency`` uploads are in
+        flight at once. JSONL encoding runs in a worker thread so one large
+        chunk doesn't stall the other uploads. With a result cache, cached
+        requests are skipped as in submit_batch() and their responses are
+        attached to the first sub-batch.
+
+        If any sub-batch fails, the others are still awaited and the first
+        error is re-raised with the IDs of the batches that were created
+        (which keep running) attached as a note and logged.
+
+        Args:
+            requests: List of batch request dictionaries
+            chunk_size: Maximum number of requests per sub-batch
+            concurrency: Maximum concurrent submissions (capped at
+                MAX_SUBMIT_CONCURRENCY)
+
+        Returns:
+            Batch IDs in the same order as the request chunks
+        """
+        if not requests:
+            raise ValueError("Cannot submit empty batch")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be positive: {chunk_size}")
+        _validate_requests(requests)
+
+        requests, record = self._partition_cached(requests)
+        if not requests:
+            batch_id = f"{CACHED_BATCH_PREFIX}{uuid.uuid4().hex}"
+            record(batch_id)
+            logger.info(f"All requests served from cache: {batch_id}")
+            return [batch_id]
+
+        chunks = [
+            requests[i : i + chunk_size] for i in range(0, len(requests), chunk_size)
+        ]
+        semaphore = asyncio.Semaphore(max(1, min(concurrency, MAX_SUBMIT_CONCURRENCY)))
+
+        logger.info(
+            f"Submitting {len(requests)} requests as {len(chunks)} OpenAI batches"
+        )
+
+        async def submit_chunk(chunk: list[dict[str, Any]]) -> str:
+            async with semaphore:
+                payload = await asyncio.to_thread(_write_jsonl, chunk)
+                with payload:
+                    await self._bucket.acquire_async()
+                    input_file = await aclient.files.create(
+                        file=("batch.jsonl", payload), purpose="batch"
+                    )
+                await self._bucket.acquire_async()
+                batch = await aclient.batches.create(
+                    input_file_id=input_file.id,
+                    endpoint=self.endpoint,  # type: ignore[arg-type]
+                    completion_window=self.completion_window,  # type: ignore[arg-type]
+                )
+                logger.info(f"Batch submitted successfully: {batch.id}")
+                return batch.id
+
+        async with self._make_async_client() as aclient:
+            outcomes = await asyncio.gather(
+                *(submit_chunk(c) for c in chunks), return_exceptions=True
+            )
+
+        batch_ids = [o for o in outcomes if isinstance(o, str)]
+        errors = [o for o in outcomes if isinstance(o, BaseException)]
+        if errors:
+            logger.error(
+                f"Failed to submit {len(errors)} of {len(chunks)} OpenAI batches: "
+                f"{errors[0]}. Batches already created: {batch_ids or 'none'}"
+            )
+            errors[0].add_note(f"Batches already created: {batch_ids}")
+            raise errors[0]
+
+        for index, (batch_id, chunk) in enumerate(zip(batch_ids, chunks, strict=True)):
+            record(batch_id, chunk, with_hits=index == 0)
+        return batch_ids
+
+    def get_batch_status(
+        self, batch_id: str, refresh: bool = False, ttl_ms: int = 0
+    ) -> dict[str, Any]:
         """Get status of a batch.
 
+        Terminal statuses never change, so they are cached per client and
+        returned without another API call. Non-terminal statuses can be
+        reused for up to ``ttl_ms`` milliseconds when the caller tolerates
+        slightly stale data. Callers always receive their own copy, so
+        mutating it doesn't affect the caches.
+
         Args:
             batch_id: Batch ID returned from submit_batch()
+            refresh: If True, bypass both status caches
+            ttl_ms: Maximum age in milliseconds of a cached status to accept
+                (0 always fetches a fresh status)
 
         Returns:
             Dictionary with batch status information
         """
+        if batch_id.startswith(CACHED_BATCH_PREFIX):
+            return self._cached_batch_status(batch_id)
+
+        if not refresh:
+            if batch_id in self._terminal_cache:
+                return copy.deepcopy(self._terminal_cache[batch_id])
+
+            cached = self._status_cache.get(batch_id)
+            if ttl_ms > 0 and cached is not None:
+                fetched_at, cached_status = cached
+                if (_monotonic() - fetched_at) * 1000 < ttl_ms:
+                    return copy.deepcopy(cached_status)
+
         try:
+            self._bucket.acquire()
             batch = self.client.batches.retrieve(batch_id)
             counts = _get_value(batch, "request_counts", {})
             total = _get_value(counts, "total", 0) or 0
@@ -343,7 +893,7 @@ class OpenAIBatchClient:
             processing = max(total - completed - failed, 0)
             status = _get_value(batch, "status", "in_progress")
 
-            return {
+            result = {
                 "id": batch.id,
                 "processing_status": "ended"
                 if status == "completed"
@@ -367,18 +917,57 @@ class OpenAIBatchClient:
             logger.error(f"Failed to get OpenAI batch status: {e}")
             raise
 
+        if status in OPENAI_TERMINAL_STATUSES:
+            # Terminal entries supersede the TTL cache, which therefore only
+            # ever holds batches that are still running
+            self._status_cache.pop(batch_id, None)
+            self._terminal_cache.pop(batch_id, None)
+            self._terminal_cache[batch_id] = result
+            if len(self._terminal_cache) > TERMINAL_STATUS_CACHE_SIZE:
+                del self._terminal_cache[next(iter(self._terminal_cache))]
+        else:
+            # Stamp after the response arrives so the entry isn't pre-aged
+            # by the request latency
+            self._status_cache[batch_id] = (_monotonic(), result)
+        return copy.deepcopy(result)
+
+    def _cached_batch_status(self, batch_id: str) -> dict[str, Any]:
+        hits, _ = self._load_cached_batch(batch_id)
+        succeeded = len(hits)
+        return {
+            "id": batch_id,
+            "processing_status": "ended",
+            "provider_status": "completed",
+            "request_counts": {
+                "processing": 0,
+                "succeeded": succeeded,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "ended_at": None,
+            "created_at": None,
+            "expires_at": None,
+            "output_file_id": None,
+            "error_file_id": None,
+        }
+
     def poll_batch(
         self,
         batch_id: str,
-        poll_interval: int = 30,
+        poll_interval: float = 30,
         timeout: int = 86400,  # 24 hours
+        max_interval: float = MAX_POLL_INTERVAL,
     ) -> dict[str, Any]:
         """Poll batch until completion.
 
         Args:
             batch_id: Batch ID to poll
-            poll_interval: Seconds between status checks
-            timeout: Maximum seconds to wait
+            poll_interval: Base seconds between status checks (backs off
+                exponentially while the status is unchanged)
+            timeout: Maximum seconds to wait, measured on the monotonic
+                clock so wall-clock adjustments don't affect it
+            max_interval: Upper bound in seconds for the backoff
 
         Returns:
             Final batch status dictionary
@@ -387,61 +976,140 @@ class OpenAIBatchClient:
             TimeoutError: If batch doesn't complete within timeout
             Exception: If batch fails or API call fails
         """
-        logger.info(f"Polling OpenAI batch {batch_id} (interval={poll_interval}s)")
-
-        start_time = time.time()
-        last_log_time = start_time
-
-        while True:
-            elapsed = time.time() - start_time
-            if elapsed > timeout:
-                raise TimeoutError(
-                    f"Batch {batch_id} did not complete within {timeout}s"
-                )
+        return _poll(
+            self,
+            batch_id,
+            state_key="provider_status",
+            done_states={"completed"},
+            failed_states=OPENAI_FAILED_STATUSES,
+            poll_interval=poll_interval,
+            timeout=timeout,
+            max_interval=max_interval,
+        )
 
-            status = self.get_batch_status(batch_id)
-            provider_status = status.get("provider_status")
+    def wait_for_batch(
+        self,
+        batch_id: str,
+        via: str = "poll",
+        poll_interval: int = 30,
+        timeout: int = 86400,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_WEBHOOK_PORT,
+        webhook_secret: str | None = None,
+    ) -> dict[str, Any]:
+        """Wait for a batch to finish, by polling or by webhook.
 
-            if time.time() - last_log_time >= 300:
-                counts = status["request_counts"]
-                logger.info(
-                    f"Batch progress: "
-                    f"{counts['succeeded']} succeeded, "
-                    f"{counts['processing']} processing, "
-                    f"{counts['errored']} errored"
-                )
-                last_log_time = time.time()
+        With ``via="webhook"`` a local HTTP receiver listens on host:port
+        for OpenAI's ``batch.*`` webhook events, so completion is noticed as
+        soon as it is pushed. The project's webhook endpoint must be
+        configured in the OpenAI dashboard to reach this receiver (e.g.
+        through a tunnel). Status is still checked every
+        WEBHOOK_FALLBACK_INTERVAL seconds in case a delivery is missed.
+        The call falls back to polling if the SDK lacks webhook support, no
+        signing secret is available, or the receiver cannot start.
 
-            if provider_status == "completed":
-                logger.info(
-                    f"Batch completed: "
-                    f"{status['request_counts']['succeeded']} succeeded, "
-                    f"{status['request_counts']['errored']} errored"
-                )
-                return status
+        Args:
+            batch_id: Batch ID to wait for
+            via: "poll" or "webhook"
+            poll_interval: Base seconds between status checks when polling
+            timeout: Maximum seconds to wait
+            host: Interface for the webhook receiver
+            port: Port for the webhook receiver
+            webhook_secret: Webhook signing secret (defaults to the
+                OPENAI_WEBHOOK_SECRET env var)
 
-            if provider_status in {"failed", "expired", "canceled"}:
-                raise Exception(f"Batch failed with status: {provider_status}")
+        Returns:
+            Final batch status dictionary
 
-            logger.debug(
-                f"Batch still processing ({provider_status}), "
-                f"waiting {poll_interval}s..."
+        Raises:
+            ValueError: If via is not "poll" or "webhook"
+            TimeoutError: If batch doesn't complete within timeout
+            Exception: If batch fails or API call fails
+        """
+        if via not in {"poll", "webhook"}:
+            raise ValueError(f"Unsupported wait mode: {via}")
+        if via == "poll":
+            return self.poll_batch(batch_id, poll_interval, timeout)
+
+        secret = (
+            webhook_secret
+            or getattr(self.client, "webhook_secret", None)
+            or os.environ.get("OPENAI_WEBHOOK_SECRET")
+        )
+        if not hasattr(self.client, "webhooks"):
+            logger.warning("OpenAI SDK has no webhook support, polling instead")
+            return self.poll_batch(batch_id, poll_interval, timeout)
+        if not secret:
+            # Every delivery would fail verification without a secret
+            logger.warning(
+                "No webhook secret (pass webhook_secret or set "
+                "OPENAI_WEBHOOK_SECRET), polling instead"
             )
-            time.sleep(poll_interval)
+            return self.poll_batch(batch_id, poll_interval, timeout)
 
-    def get_batch_results(self, batch_id: str) -> list[dict[str, Any]]:
-        """Retrieve results from completed batch.
+        def unwrap(body: bytes, headers: dict[str, str]) -> Any:
+            return self.client.webhooks.unwrap(body, headers, secret=secret)
+
+        try:
+            receiver = _BatchWebhookReceiver(batch_id, unwrap, host=host, port=port)
+        except OSError as e:
+            logger.warning(f"Webhook receiver unavailable ({e}), polling instead")
+            return self.poll_batch(batch_id, poll_interval, timeout)
+
+        logger.info(f"Waiting for webhook on {host}:{receiver.port} for {batch_id}")
+        start_time = _monotonic()
+        with receiver:
+            while True:
+                # Covers batches that finished before the receiver started
+                # as well as missed deliveries
+                status = self.get_batch_status(batch_id)
+                provider_status = status.get("provider_status")
+                if provider_status == "completed":
+                    return status
+                if provider_status in OPENAI_FAILED_STATUSES:
+                    raise Exception(f"Batch failed with status: {provider_status}")
+
+                remaining = timeout - (_monotonic() - start_time)
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"Batch {batch_id} did not complete within {timeout}s"
+                    )
+                if receiver.wait(min(WEBHOOK_FALLBACK_INTERVAL, remaining)):
+                    break
+
+        # The event has arrived; poll briefly in case the status endpoint
+        # lags behind the webhook
+        remaining = max(1, int(timeout - (_monotonic() - start_time)))
+        return self.poll_batch(batch_id, poll_interval=1, timeout=remaining)
+
+    def iter_batch_results(
+        self, batch_id: str, status: dict[str, Any] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Stream results from completed batch one record at a time.
+
+        The output file is read line by line, so memory use stays flat
+        regardless of batch size.
 
         Args:
             batch_id: Batch ID of completed batch
+            status: Final status from poll_batch(), if the caller has it;
+                otherwise the status is fetched
 
-        Returns:
-            List of result dictionaries
+        Yields:
+            Result dictionaries, cached results first and then the output
+            file in order. Successful fresh results are stored in the
+            result cache.
         """
         logger.info(f"Retrieving OpenAI results for batch {batch_id}")
 
+        cache_hits, cache_keys = self._load_cached_batch(batch_id)
+        if batch_id.startswith(CACHED_BATCH_PREFIX):
+            yield from cache_hits
+            return
+
         try:
-            status = self.get_batch_status(batch_id)
+            if status is None:
+                status = self.get_batch_status(batch_id)
             if status.get("provider_status") != "completed":
                 raise ValueError(
                     f"Batch not completed: {status.get('provider_status')}"
@@ -451,50 +1119,90 @@ class OpenAIBatchClient:
             if not output_file_id:
                 raise ValueError("No output_file_id available for batch")
 
-            content = self.client.files.content(output_file_id)
-            raw_text = _read_binary_response(content)
-
-            results = []
-            for line in raw_text.splitlines():
-                if not line.strip():
-                    continue
-                record = json.loads(line)
-                custom_id = record.get("custom_id", "unknown")
-                response = record.get("response") or {}
-                status_code = response.get("status_code")
-                if status_code == 200:
-                    body = response.get("body", {})
-                    text_content = _extract_openai_text(body)
-                    result_obj = {
-                        "type": "succeeded" if text_content else "errored",
-                        "message": {
-                            "content": [
-                                {"type": "text", "text": text_content or ""}
-                            ]
-                        },
-                    }
-                else:
-                    error_detail = record.get("error") or response.get("body")
-                    result_obj = {
-                        "type": "errored",
-                        "error": error_detail,
-                    }
-
-                results.append({"custom_id": custom_id, "result": result_obj})
-
-            logger.info(f"Retrieved {len(results)} results")
-            return results
+            yield from cache_hits
+            count = 0
+            pending: list[tuple[str, str, dict[str, Any]]] = []
+            self._bucket.acquire()
+            try:
+                with self.client.files.with_streaming_response.content(
+                    output_file_id
+                ) as content:
+                    for line in _iter_response_lines(content):
+                        if not line.strip():
+                            continue
+                        record = _parse_openai_record(json_loads(line))
+                        key = cache_keys.get(record["custom_id"])
+                        succeeded = record["result"]["type"] == "succeeded"
+                        if key is not None and succeeded:
+                            pending.append((key, record["custom_id"], record))
+                            if len(pending) >= CACHE_WRITE_BATCH_SIZE:
+                                self._flush_cache_writes(pending)
+                        yield record
+                        count += 1
+            finally:
+                # Also runs if the caller stops iterating early
+                self._flush_cache_writes(pending)
+
+            logger.info(f"Retrieved {count} results")
 
         except Exception as e:
             logger.error(f"Failed to retrieve OpenAI batch results: {e}")
             raise
 
+    def _flush_cache_writes(
+        self, pending: list[tuple[str, str, dict[str, Any]]]
+    ) -> None:
+        if self.cache is not None and pending:
+            self.cache.put_many(pending)
+        pending.clear()
+
+    def get_batch_results(
+        self, batch_id: str, status: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        """Retrieve results from completed batch.
+
+        Args:
+            batch_id: Batch ID of completed batch
+            status: Final status from poll_batch(), if the caller has it
+
+        Returns:
+            List of result dictionaries
+        """
+        return list(self.iter_batch_results(batch_id, status=status))
+
+    def submit_and_poll(
+        self,
+        requests: list[dict[str, Any]],
+        poll_interval: int = 30,
+        timeout: int = 86400,
+    ) -> list[dict[str, Any]]:
+        """Submit a batch, wait for it to finish, and return its results.
+
+        Polling starts as soon as the batch is created, so small batches
+        that finish within seconds are picked up without waiting a full
+        poll interval.
+
+        Args:
+            requests: List of batch request dictionaries
+            poll_interval: Base seconds between status checks
+            timeout: Maximum seconds to wait for completion
+
+        Returns:
+            List of result dictionaries
+        """
+        batch_id = self.submit_batch(requests)
+        status = self.poll_batch(batch_id, poll_interval=poll_interval, timeout=timeout)
+        return self.get_batch_results(batch_id, status=status)
+
 
 class BatchClient:
     """Client for interacting with supported batch APIs."""
 
     def __init__(
-        self, provider: str = "openai", api_key: str | None = None
+        self,
+        provider: str = "openai",
+        api_key: str | None = None,
+        cache: ResultCache | None = None,
     ) -> None:
         provider_normalized = provider.lower()
         if provider_normalized == "anthropic":
@@ -502,7 +1210,7 @@ class BatchClient:
                 "Anthropic provider is disabled for now. Use --provider openai."
             )
         elif provider_normalized == "openai":
-            self.client = OpenAIBatchClient(api_key=api_key)
+            self.client = OpenAIBatchClient(api_key=api_key, cache=cache)
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
@@ -511,21 +1219,89 @@ class BatchClient:
     def submit_batch(self, requests: list[dict[str, Any]]) -> str:
         return self.client.submit_batch(requests)
 
-    def get_batch_status(self, batch_id: str) -> dict[str, Any]:
-        return self.client.get_batch_status(batch_id)
+    async def submit_batches(
+        self,
+        requests: list[dict[str, Any]],
+        chunk_size: int = SUB_BATCH_SIZE,
+        concurrency: int = 8,
+    ) -> list[str]:
+        return await self.client.submit_batches(
+            requests, chunk_size=chunk_size, concurrency=concurrency
+        )
+
+    def get_batch_status(
+        self, batch_id: str, refresh: bool = False, ttl_ms: int = 0
+    ) -> dict[str, Any]:
+        return self.client.get_batch_status(
+            batch_id, refresh=refresh, ttl_ms=ttl_ms
+        )
 
     def poll_batch(
         self,
         batch_id: str,
-        poll_interval: int = 30,
+        poll_interval: float = 30,
         timeout: int = 86400,
+        max_interval: float = MAX_POLL_INTERVAL,
     ) -> dict[str, Any]:
         return self.client.poll_batch(
-            batch_id, poll_interval=poll_interval, timeout=timeout
+            batch_id,
+            poll_interval=poll_interval,
+            timeout=timeout,
+            max_interval=max_interval,
+        )
+
+    def wait_for_batch(
+        self,
+        batch_id: str,
+        via: str = "poll",
+        poll_interval: int = 30,
+        timeout: int = 86400,
+        **webhook_options: Any,
+    ) -> dict[str, Any]:
+        return self.client.wait_for_batch(
+            batch_id,
+            via=via,
+            poll_interval=poll_interval,
+            timeout=timeout,
+            **webhook_options,
+        )
+
+    def iter_batch_results(
+        self, batch_id: str, status: dict[str, Any] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        return self.client.iter_batch_results(batch_id, status=status)
+
+    def get_batch_results(
+        self, batch_id: str, status: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        return self.client.get_batch_results(batch_id, status=status)
+
+    def submit_and_poll(
+        self,
+        requests: list[dict[str, Any]],
+        poll_interval: int = 30,
+        timeout: int = 86400,
+    ) -> list[dict[str, Any]]:
+        return self.client.submit_and_poll(
+            requests, poll_interval=poll_interval, timeout=timeout
         )
 
-    def get_batch_results(self, batch_id: str) -> list[dict[str, Any]]:
-        return self.client.get_batch_results(batch_id)
+
+# Clients shared by the convenience functions, keyed by (provider, api_key),
+# so repeated calls reuse one HTTP connection pool
+_CLIENT_CACHE: dict[tuple[str, str | None], BatchClient] = {}
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def _get_or_create_client(provider: str, api_key: str | None) -> BatchClient:
+    """Return the cached BatchClient for a provider/key, creating it once."""
+    key = (provider.lower(), api_key)
+    with _CLIENT_CACHE_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            client = BatchClient(provider=provider, api_key=api_key)
+            _CLIENT_CACHE[key] = client
+        return client
 
 
 def submit_batch(
@@ -535,7 +1311,7 @@ def submit_batch(
 ) -> str:
     """Submit batch of requests to a supported API.
 
-    Convenience function that creates a client and submits batch.
+    Convenience function that reuses a shared client and submits batch.
 
     Args:
         requests: List of batch request dictionaries
@@ -545,7 +1321,7 @@ def submit_batch(
     Returns:
         Batch ID for polling
     """
-    client = BatchClient(provider=provider, api_key=api_key)
+    client = _get_or_create_client(provider, api_key)
     return client.submit_batch(requests)
 
 
@@ -558,19 +1334,19 @@ def poll_batch(
 ) -> dict[str, Any]:
     """Poll batch until completion.
 
-    Convenience function that creates a client and polls batch.
+    Convenience function that reuses a shared client and polls batch.
 
     Args:
         batch_id: Batch ID to poll
         api_key: Optional API key (provider-specific env var is fallback)
-        poll_interval: Seconds between status checks
+        poll_interval: Base seconds between status checks
         timeout: Maximum seconds to wait
         provider: "openai"
 
     Returns:
         Final batch status dictionary
     """
-    client = BatchClient(provider=provider, api_key=api_key)
+    client = _get_or_create_client(provider, api_key)
     return client.poll_batch(batch_id, poll_interval, timeout)
 
 
@@ -581,7 +1357,7 @@ def get_batch_results(
 ) -> list[dict[str, Any]]:
     """Retrieve results from completed batch.
 
-    Convenience function that creates a client and retrieves results.
+    Convenience function that reuses a shared client and retrieves results.
 
     Args:
         batch_id: Batch ID of completed batch
@@ -591,5 +1367,5 @@ def get_batch_results(
     Returns:
         List of result dictionaries
     """
-    client = BatchClient(provider=provider, api_key=api_key)
+    client = _get_or_create_client(provider, api_key)
     return client.get_batch_results(batch_id)
@@ -0,0 +1,251 @@
+"""Local on-disk caches for photo-critic."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from photo_critic._json import json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+# Cache policies:
+#   enabled    - read hits, submit misses, store new results
+#   read-only  - read hits, submit misses, never store
+#   write-only - always submit, store new results
+#   replay     - only serve from the cache; a miss is an error
+#   disabled   - bypass the cache entirely
+CACHE_POLICIES = frozenset({"enabled", "read-only", "write-only", "replay", "disabled"})
+
+RESULT_CACHE_FILENAME = "results.sqlite3"
+
+# Set this environment variable to skip the on-disk discovery and
+# preprocessing caches (the result cache is controlled by its policy)
+NO_CACHE_ENV = "PHOTO_CRITIC_NO_CACHE"
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS results ("
+    "key TEXT PRIMARY KEY, "
+    "custom_id TEXT, "
+    "response_json BLOB, "
+    "fetched_at REAL)",
+    # Which requests went into each batch, so a later process can rebuild
+    # the cached part of a batch and write back its fresh results
+    "CREATE TABLE IF NOT EXISTS batch_requests ("
+    "batch_id TEXT, "
+    "custom_id TEXT, "
+    "key TEXT, "
+    "cached INTEGER, "
+    "PRIMARY KEY (batch_id, custom_id))",
+)
+
+
+def get_cache_dir() -> Path:
+    """Return the photo-critic cache directory.
+
+    Honors ``$XDG_CACHE_HOME`` and falls back to ``~/.cache/photo-critic``.
+    The directory is not created.
+
+    Returns:
+        Path to the cache directory
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "photo-critic"
+
+
+def request_key(request: dict[str, Any]) -> str:
+    """Compute the cache key for a batch request.
+
+    The key is the SHA-256 of the canonical JSON form of the request with
+    ``custom_id`` removed, since custom IDs encode the position of an image
+    in a run rather than what is being asked.
+
+    Args:
+        request: Batch request dictionary
+
+    Returns:
+        Hex-encoded SHA-256 digest
+    """
+    payload = {k: v for k, v in request.items() if k != "custom_id"}
+    return hashlib.sha256(json_dumps(payload, sort_keys=True)).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed cache of batch results keyed by request hash."""
+
+    def __init__(self, path: Path | None = None, policy: str = "enabled") -> None:
+        """Open (or create) a result cache.
+
+        Args:
+            path: SQLite database path (defaults to the user cache dir)
+            policy: One of CACHE_POLICIES
+
+        Raises:
+            ValueError: If policy is not recognized
+        """
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"Invalid cache policy: {policy}")
+
+        self.policy = policy
+        self.path = path or get_cache_dir() / RESULT_CACHE_FILENAME
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+        if policy != "disabled":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            self._conn.commit()
+            logger.debug(f"Result cache opened at {self.path} ({policy})")
+
+    @property
+    def readable(self) -> bool:
+        """Whether lookups may be served from the cache."""
+        return self.policy in {"enabled", "read-only", "replay"}
+
+    @property
+    def writable(self) -> bool:
+        """Whether new results are stored."""
+        return self.policy in {"enabled", "write-only"}
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return the cached result record for a key, if any."""
+        if self._conn is None or not self.readable:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response_json FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        return json_loads(row[0]) if row else None
+
+    def put(self, key: str, custom_id: str, result: dict[str, Any]) -> None:
+        """Store a result record under a key (no-op unless writable)."""
+        self.put_many([(key, custom_id, result)])
+
+    def put_many(self, records: list[tuple[str, str, dict[str, Any]]]) -> None:
+        """Store (key, custom_id, result) records in a single transaction.
+
+        No-op unless the cache is writable.
+        """
+        if self._conn is None or not self.writable or not records:
+            return
+        fetched_at = time.time()
+        rows = [
+            (key, custom_id, json_dumps(result), fetched_at)
+            for key, custom_id, result in records
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows
+            )
+
+    def partition(
+        self, requests: list[dict[str, Any]]
+    ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], dict[str, str]]:
+        """Split requests into cached results and requests still to submit.
+
+        Args:
+            requests: List of batch request dictionaries
+
+        Returns:
+            Tuple of (hit results relabeled with the request's custom_id,
+            missed requests, custom_id -> key for every request)
+
+        Raises:
+            ValueError: If the policy is "replay" and any request misses
+        """
+        hits: list[dict[str, Any]] = []
+        misses: list[dict[str, Any]] = []
+        keys: dict[str, str] = {}
+
+        for request in requests:
+            key = request_key(request)
+            keys[request["custom_id"]] = key
+            cached = self.get(key)
+            if cached is not None:
+                hits.append({**cached, "custom_id": request["custom_id"]})
+            else:
+                misses.append(request)
+
+        if misses and self.policy == "replay":
+            raise ValueError(
+                f"{len(misses)} requests are not in the result cache "
+                "(cache policy is 'replay')"
+            )
+
+        logger.info(f"Result cache: {len(hits)} hits, {len(misses)} misses")
+        return hits, misses, keys
+
+    def record_batch(
+        self, batch_id: str, keys: dict[str, str], cached_ids: set[str]
+    ) -> None:
+        """Remember which requests make up a batch.
+
+        Args:
+            batch_id: Provider batch ID (or local ID for fully cached batches)
+            keys: custom_id -> cache key for every request in the batch
+            cached_ids: custom_ids whose results were served from the cache
+        """
+        if self._conn is None:
+            return
+        rows = [
+            (batch_id, custom_id, key, custom_id in cached_ids)
+            for custom_id, key in keys.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO batch_requests VALUES (?, ?, ?, ?)", rows
+            )
+
+    def load_batch(
+        self, batch_id: str
+    ) -> tuple[list[dict[str, Any]], dict[str, str]] | None:
+        """Load the cached part of a recorded batch.
+
+        Args:
+            batch_id: Batch ID passed to record_batch()
+
+        Returns:
+            Tuple of (cached results relabeled with their custom_id in this
+            batch, custom_id -> key for the submitted requests), or None if
+            the batch was never recorded
+        """
+        if self._conn is None:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT b.custom_id, b.key, b.cached, r.response_json "
+                "FROM batch_requests b LEFT JOIN results r ON r.key = b.key "
+                "WHERE b.batch_id = ?",
+                (batch_id,),
+            ).fetchall()
+        if not rows:
+            return None
+
+        hits: list[dict[str, Any]] = []
+        submitted: dict[str, str] = {}
+        for custom_id, key, cached, response_json in rows:
+            if not cached:
+                submitted[custom_id] = key
+            elif response_json is not None:
+                hits.append({**json_loads(response_json), "custom_id": custom_id})
+            else:
+                logger.warning(f"Cached result for {custom_id} is missing")
+        return hits, submitted
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "ResultCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -11,10 +11,11 @@ from rich.logging import RichHandler
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.table import Table
 
-from photo_critic.batch import BatchClient
-from photo_critic.discovery import discover_images, get_image_stats
-from photo_critic.prepare import DEFAULT_OPENAI_MODEL, prepare_batch
-from photo_critic.report import generate_report
+from photo_critic.cache import CACHE_POLICIES, ResultCache
+from photo_critic.discovery import get_image_stats, scan_images
+
+# The batch, prepare and report modules pull in the OpenAI SDK and Pillow;
+# main() imports them only once it gets past --dry-run
 
 # Set up rich console
 console = Console()
@@ -57,6 +58,12 @@ def setup_logging(verbose: bool = False) -> None:
     default=0.0,
     help="Only include images above this score",
 )
+@click.option(
+    "--top",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Only include this many of the best-scoring images",
+)
 @click.option(
     "--provider",
     type=click.Choice(["openai"], case_sensitive=False),
@@ -79,7 +86,7 @@ def setup_logging(verbose: bool = False) -> None:
     "--max-images",
     type=int,
     default=100,
-    help="Limit number of images to process",
+    help="Process only the newest images, up to this many",
 )
 @click.option(
     "--recursive",
@@ -87,6 +94,26 @@ def setup_logging(verbose: bool = False) -> None:
     is_flag=True,
     help="Include subdirectories",
 )
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=1.0),
+    default=5.0,
+    show_default=True,
+    help="Initial seconds between batch status checks",
+)
+@click.option(
+    "--poll-max",
+    type=click.FloatRange(min=1.0),
+    default=120.0,
+    show_default=True,
+    help="Longest wait between status checks while backing off",
+)
+@click.option(
+    "--cache-policy",
+    type=click.Choice(sorted(CACHE_POLICIES), case_sensitive=False),
+    default="enabled",
+    help="Reuse cached responses for unchanged requests",
+)
 @click.option(
     "--verbose",
     "-v",
@@ -98,11 +125,15 @@ def main(
     output: Path,
     format: str,
     min_score: float,
+    top: int | None,
     provider: str,
     model: str,
     dry_run: bool,
     max_images: int,
     recursive: bool,
+    poll_interval: float,
+    poll_max: float,
+    cache_policy: str,
     verbose: bool,
 ) -> None:
     """Photo Critic - AI-powered batch photo criticism using vision APIs.
@@ -123,6 +154,10 @@ def main(
         # Only include photos scoring 7 or higher
         $ photo-critic ./photos --min-score 7.0
 
+        \b
+        # Only include the 10 best photos
+        $ photo-critic ./photos --top 10
+
         \b
         # Dry run to see what would be processed
         $ photo-critic ./photos --dry-run
@@ -135,8 +170,6 @@ def main(
     setup_logging(verbose)
 
     provider = provider.lower()
-    if model is None:
-        model = DEFAULT_OPENAI_MODEL
 
     console.print(
         "\n[bold cyan]Photo Critic[/bold cyan] - AI Photo Analysis "
@@ -147,7 +180,8 @@ def main(
     console.print("[bold]1. Discovering images...[/bold]")
 
     try:
-        images = discover_images(path, recursive=recursive, max_images=max_images)
+        discovered = scan_images(path, recursive=recursive, max_images=max_images)
+        images = [image.path for image in discovered]
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
         sys.exit(1)
@@ -157,7 +191,7 @@ def main(
         sys.exit(0)
 
     # Show discovery stats
-    stats = get_image_stats(images)
+    stats = get_image_stats(discovered)
     table = Table(title="Discovery Summary")
     table.add_column("Metric", style="cyan")
     table.add_column("Value", style="green")
@@ -180,16 +214,19 @@ def main(
             console.print(f"  ... and {len(images) - 10} more")
         sys.exit(0)
 
+    from photo_critic.batch import BatchClient
+    from photo_critic.prepare import DEFAULT_MODELS, prepare_batch
+    from photo_critic.report import generate_report
+
+    if model is None:
+        model = DEFAULT_MODELS[provider.lower()]
+
     # 2. Preparation Phase
     console.print("\n[bold]2. Preparing batch...[/bold]")
 
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console,
-    ) as progress:
-        task = progress.add_task("Processing images...", total=None)
-
+    # A plain status line is enough here; the Progress display (and its
+    # refresh thread) is kept for the long-running poll below
+    with console.status("Processing images...", spinner="dots"):
         try:
             batch_requests, image_metadata = prepare_batch(
                 images, model=model, provider=provider
@@ -198,8 +235,6 @@ def main(
             console.print(f"[bold red]Error:[/bold red] {e}")
             sys.exit(1)
 
-        progress.update(task, completed=True)
-
     console.print(f"[green]Prepared {len(batch_requests)} requests[/green]")
 
     if not batch_requests:
@@ -215,7 +250,9 @@ def main(
     console.print("\n[bold]3. Submitting batch...[/bold]")
 
     try:
-        client = BatchClient(provider=provider)
+        cache = ResultCache(policy=cache_policy.lower())
+        click.get_current_context().call_on_close(cache.close)
+        client = BatchClient(provider=provider, cache=cache)
         batch_id = client.submit_batch(batch_requests)
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
@@ -238,7 +275,11 @@ def main(
         ) as progress:
             task = progress.add_task("Processing batch...", total=None)
 
-            status = client.poll_batch(batch_id, poll_interval=30)
+            status = client.poll_batch(
+                batch_id,
+                poll_interval=min(poll_interval, poll_max),
+                max_interval=poll_max,
+            )
 
             progress.update(task, completed=True)
 
@@ -253,7 +294,8 @@ def main(
     except KeyboardInterrupt:
         console.print(
             f"\n[yellow]Interrupted.[/yellow] Batch ID: {batch_id}\n"
-            "You can retrieve results later using this batch ID."
+            "You can retrieve results later using this batch ID "
+            "(keep the result cache enabled to include cached responses)."
         )
         sys.exit(130)
     except Exception as e:
@@ -265,7 +307,7 @@ def main(
     console.print("\n[bold]5. Retrieving results...[/bold]")
 
     try:
-        batch_results = client.get_batch_results(batch_id)
+        batch_results = client.get_batch_results(batch_id, status=status)
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
         sys.exit(1)
@@ -282,6 +324,7 @@ def main(
             output,
             format=format,
             min_score=min_score,
+            top_k=top,
         )
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
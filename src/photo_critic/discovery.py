@@ -1,18 +1,54 @@
 """Image discovery module for finding images in directories."""
 
+import functools
+import hashlib
+import heapq
 import logging
+import os
+import queue
+import threading
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Any, NamedTuple
+
+from photo_critic._json import json_dumps, json_loads
+from photo_critic.cache import NO_CACHE_ENV, get_cache_dir
 
 logger = logging.getLogger(__name__)
 
 # Supported image formats
 SUPPORTED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".heic"}
+# Same extensions as a tuple for a single str.endswith() test per file
+_SUPPORTED_SUFFIXES = tuple(SUPPORTED_EXTENSIONS)
 
 # Minimum file size to avoid thumbnails and tiny images (100KB)
 MIN_FILE_SIZE = 100 * 1024
 
-# Directory patterns to exclude
-EXCLUDED_DIRS = {"_cache", "__MACOSX", "thumbnails", ".thumbnails"}
+# Directory names pruned from the walk wherever they appear below the root
+EXCLUDED_DIRS = frozenset({"_cache", "__MACOSX", "thumbnails", ".thumbnails"})
+
+# Candidates are stat'd on a thread pool once there are at least this many;
+# stat() releases the GIL, so slow (network, spinning) disks overlap requests
+PARALLEL_STAT_THRESHOLD = 64
+
+# Maximum threads used for parallel stat calls
+STAT_WORKERS = 32
+
+# Images iter_images() may find ahead of its consumer
+STREAM_QUEUE_SIZE = 256
+
+# Bumped whenever the discovery cache file format changes
+DISCOVERY_CACHE_VERSION = 2
+
+
+class DiscoveredImage(NamedTuple):
+    """A discovered image with the file metadata read while scanning."""
+
+    path: Path
+    size: int
+    mtime: float
 
 
 def discover_images(
@@ -26,7 +62,7 @@ def discover_images(
     Args:
         path: Directory path to search
         recursive: If True, search subdirectories
-        max_images: Optional limit on number of images to return
+        max_images: Optional limit; the newest max_images images are kept
 
     Returns:
         List of Path objects for discovered images, sorted by modification time
@@ -35,62 +71,326 @@ def discover_images(
         ValueError: If path doesn't exist or isn't a directory
         PermissionError: If directory cannot be read
     """
+    return [image.path for image in scan_images(path, recursive, max_images)]
+
+
+def scan_images(
+    path: Path, recursive: bool = False, max_images: int | None = None
+) -> list[DiscoveredImage]:
+    """Find all supported images in directory, keeping their size and mtime.
+
+    Same rules as discover_images(), but each file is stat'd exactly once
+    and the result is returned alongside the path so callers (such as
+    get_image_stats()) don't need to stat it again. Paths are first
+    filtered by name alone, and only the remaining candidates are stat'd.
+
+    Results are cached on disk per directory and reused while no scanned
+    directory has changed (a file added, removed or renamed updates its
+    directory's mtime). Set PHOTO_CRITIC_NO_CACHE=1 to always rescan.
+
+    Args:
+        path: Directory path to search
+        recursive: If True, search subdirectories
+        max_images: Optional limit; the whole directory is scanned and the
+            newest max_images images are kept
+
+    Returns:
+        List of DiscoveredImage entries, newest first
+
+    Raises:
+        ValueError: If path doesn't exist or isn't a directory
+        PermissionError: If directory cannot be read
+    """
+    _check_directory(path)
+    logger.info(f"Discovering images in: {path} (recursive={recursive})")
+
+    use_cache = not os.environ.get(NO_CACHE_ENV)
+    images = _load_discovery_cache(path, recursive) if use_cache else None
+
+    if images is not None:
+        logger.info(f"Found {len(images)} images (cached)")
+    else:
+        try:
+            candidates, dir_mtimes = _find_candidates(path, recursive)
+        except PermissionError:
+            logger.error(f"Permission denied reading directory: {path}")
+            raise
+
+        images = _stat_candidates(candidates)
+        if use_cache:
+            _save_discovery_cache(path, recursive, dir_mtimes, images)
+
+    # Keep the newest images: a partial sort when only max_images are kept
+    if max_images and len(images) > max_images:
+        logger.info(f"Keeping the {max_images} newest of {len(images)} images")
+        images = heapq.nlargest(max_images, images, key=lambda image: image.mtime)
+    else:
+        images.sort(key=lambda image: image.mtime, reverse=True)
+
+    logger.info(f"Discovered {len(images)} images")
+    return images
+
+
+def iter_images(
+    path: Path, recursive: bool = False, max_images: int | None = None
+) -> Iterator[DiscoveredImage]:
+    """Yield images as they are found, scanning in a background thread.
+
+    Uses the same filters as scan_images(), but images arrive in directory
+    order rather than newest first and the discovery cache is not used.
+    The scan runs ahead of the consumer by up to STREAM_QUEUE_SIZE images,
+    so work done per image (such as preprocessing) overlaps the walk.
+
+    Args:
+        path: Directory path to search
+        recursive: If True, search subdirectories
+        max_images: Optional limit on number of images to yield
+
+    Returns:
+        Iterator of DiscoveredImage entries
+
+    Raises:
+        ValueError: If path doesn't exist or isn't a directory (raised
+            immediately, before iteration starts)
+        PermissionError: If directory cannot be read
+    """
+    _check_directory(path)
+    return _stream_images(path, recursive, max_images)
+
+
+def _stream_images(
+    path: Path, recursive: bool, max_images: int | None
+) -> Iterator[DiscoveredImage]:
+    """Generator behind iter_images()."""
+    found: queue.Queue[DiscoveredImage | BaseException | None] = queue.Queue(
+        maxsize=STREAM_QUEUE_SIZE
+    )
+    stop = threading.Event()
+
+    def put(item: DiscoveredImage | BaseException | None) -> bool:
+        # Give up once the consumer has gone away instead of blocking forever
+        while not stop.is_set():
+            try:
+                found.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def scan() -> None:
+        try:
+            count = 0
+            for entry in _iter_candidates(path, recursive, {}):
+                image = _to_image(entry, _stat_or_none(entry))
+                if image is None:
+                    continue
+                if not put(image):
+                    return
+                count += 1
+                if max_images and count >= max_images:
+                    break
+        except BaseException as e:
+            put(e)
+        finally:
+            put(None)
+
+    scanner = threading.Thread(target=scan, name="photo-critic-scan", daemon=True)
+    scanner.start()
+    try:
+        while (item := found.get()) is not None:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        scanner.join()
+
+
+def _check_directory(path: Path) -> None:
+    """Raise ValueError unless path is an existing directory."""
     if not path.exists():
         raise ValueError(f"Path does not exist: {path}")
 
     if not path.is_dir():
         raise ValueError(f"Path is not a directory: {path}")
 
-    logger.info(f"Discovering images in: {path} (recursive={recursive})")
 
-    images: list[Path] = []
+def _find_candidates(
+    path: Path, recursive: bool
+) -> tuple[list[os.DirEntry[str]], dict[str, int]]:
+    """List files that pass the name-based filters, without any file stats.
+
+    Returns:
+        Tuple of (candidate directory entries, directory -> st_mtime_ns for
+        every directory listed, used to validate the discovery cache)
 
+    Raises:
+        PermissionError: If the top-level directory cannot be read
+    """
+    dir_mtimes: dict[str, int] = {}
+    candidates = list(_iter_candidates(path, recursive, dir_mtimes))
+    return candidates, dir_mtimes
+
+
+def _iter_candidates(
+    path: Path, recursive: bool, dir_mtimes: dict[str, int]
+) -> Iterator[os.DirEntry[str]]:
+    """Yield files that pass the name-based filters, without any file stats.
+
+    Directories are walked with os.scandir(), and excluded directories are
+    pruned before they are descended into. The st_mtime_ns of every
+    directory listed is recorded in dir_mtimes.
+
+    Raises:
+        PermissionError: If the top-level directory cannot be read
+    """
+    root = str(path)
+    pending = [root]
+
+    while pending:
+        directory = pending.pop()
+        try:
+            # Taken before listing, so a change during the scan is never
+            # hidden behind a newer recorded mtime
+            dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name in EXCLUDED_DIRS:
+                            logger.debug("Skipping (excluded dir): %s", entry.path)
+                        elif recursive:
+                            pending.append(entry.path)
+                        continue
+
+                    # Check extension (case-insensitive); most names are
+                    # already lowercase, so only lower() on a miss
+                    name = entry.name
+                    dot = name.rfind(".")
+                    if dot < 0:
+                        continue
+                    ext = name[dot:]
+                    if (
+                        ext not in SUPPORTED_EXTENSIONS
+                        and ext.lower() not in SUPPORTED_EXTENSIONS
+                    ):
+                        continue
+
+                    # Skip if not a file (uses the type from the listing)
+                    if entry.is_file():
+                        yield entry
+        except OSError as e:
+            if directory == root:
+                raise
+            # Unreadable subdirectories are skipped, as Path.glob() did
+            logger.warning("Cannot read directory %s: %s", directory, e)
+
+
+def _discovery_cache_path(path: Path, recursive: bool) -> Path:
+    """Return the discovery cache file for a directory and recursion mode."""
+    key = f"{path.resolve()}\0{recursive}".encode()
+    digest = hashlib.sha1(key, usedforsecurity=False).hexdigest()
+    return get_cache_dir() / f"discovery-{digest}.json"
+
+
+def _load_discovery_cache(path: Path, recursive: bool) -> list[DiscoveredImage] | None:
+    """Return cached discovery results, or None if missing or stale."""
+    cache_path = _discovery_cache_path(path, recursive)
+    try:
+        data: dict[str, Any] = json_loads(cache_path.read_bytes())
+    except (OSError, ValueError):
+        return None
+
+    if data.get("version") != DISCOVERY_CACHE_VERSION:
+        return None
+
+    # Any file added, removed or renamed updates its directory's mtime
+    for dirpath, mtime_ns in data["dirs"].items():
+        try:
+            if os.stat(dirpath).st_mtime_ns != mtime_ns:
+                return None
+        except OSError:
+            return None
+
+    return [
+        DiscoveredImage(path / relpath, size, mtime)
+        for relpath, size, mtime in data["images"]
+    ]
+
+
+def _save_discovery_cache(
+    path: Path,
+    recursive: bool,
+    dir_mtimes: dict[str, int],
+    images: list[DiscoveredImage],
+) -> None:
+    """Write discovery results to the cache, ignoring write failures."""
+    cache_path = _discovery_cache_path(path, recursive)
+    data = {
+        "version": DISCOVERY_CACHE_VERSION,
+        "dirs": dir_mtimes,
+        "images": [
+            [str(image.path.relative_to(path)), image.size, image.mtime]
+            for image in images
+        ],
+    }
     try:
-        # Use rglob for recursive, glob for non-recursive
-        pattern = "**/*" if recursive else "*"
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_bytes(json_dumps(data))
+    except OSError as e:
+        logger.debug(f"Could not write discovery cache {cache_path}: {e}")
 
-        for file_path in path.glob(pattern):
-            # Skip if not a file
-            if not file_path.is_file():
-                continue
 
-            # Skip if in excluded directory
-            if any(excluded in file_path.parts for excluded in EXCLUDED_DIRS):
-                logger.debug(f"Skipping (excluded dir): {file_path}")
-                continue
+def _stat_or_none(entry: os.DirEntry[str]) -> os.stat_result | None:
+    """Stat a directory entry, logging and returning None if it fails."""
+    try:
+        return entry.stat()
+    except OSError as e:
+        logger.warning("Cannot stat file %s: %s", entry.path, e)
+        return None
 
-            # Check extension (case-insensitive)
-            if file_path.suffix.lower() not in SUPPORTED_EXTENSIONS:
-                continue
 
-            # Check minimum file size
-            try:
-                if file_path.stat().st_size < MIN_FILE_SIZE:
-                    logger.debug(
-                        f"Skipping (too small): {file_path} "
-                        f"({file_path.stat().st_size} bytes)"
-                    )
-                    continue
-            except OSError as e:
-                logger.warning(f"Cannot stat file {file_path}: {e}")
-                continue
+def _to_image(
+    entry: os.DirEntry[str], st: os.stat_result | None
+) -> DiscoveredImage | None:
+    """Apply the size filter to a stat'd candidate (None if rejected).
 
-            images.append(file_path)
-            logger.debug(f"Discovered: {file_path}")
+    Runs once per file, so its log calls pass arguments lazily rather than
+    formatting f-strings that are dropped unless DEBUG is enabled.
+    """
+    if st is None:
+        return None
 
-            # Stop if we've reached the max
-            if max_images and len(images) >= max_images:
-                logger.info(f"Reached max_images limit: {max_images}")
-                break
+    # Check minimum file size
+    if st.st_size < MIN_FILE_SIZE:
+        logger.debug("Skipping (too small): %s (%d bytes)", entry.path, st.st_size)
+        return None
 
-    except PermissionError:
-        logger.error(f"Permission denied reading directory: {path}")
-        raise
+    file_path = Path(entry.path)
+    logger.debug("Discovered: %s", file_path)
+    return DiscoveredImage(file_path, st.st_size, st.st_mtime)
 
-    # Sort by modification time (newest first)
-    images.sort(key=lambda p: p.stat().st_mtime, reverse=True)
 
-    logger.info(f"Discovered {len(images)} images")
+def _stat_candidates(candidates: list[os.DirEntry[str]]) -> list[DiscoveredImage]:
+    """Stat candidate files in one pass, keeping those large enough.
+
+    The single stat per file answers both the size filter and the mtime
+    sort key. Large candidate lists are stat'd concurrently. Path objects
+    are only built for accepted files.
+    """
+    if len(candidates) >= PARALLEL_STAT_THRESHOLD:
+        workers = min(STAT_WORKERS, len(candidates))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            stats = list(pool.map(_stat_or_none, candidates))
+    else:
+        stats = [_stat_or_none(entry) for entry in candidates]
+
+    images: list[DiscoveredImage] = []
+
+    for entry, st in zip(candidates, stats, strict=True):
+        image = _to_image(entry, st)
+        if image is not None:
+            images.append(image)
+
     return images
 
 
@@ -108,21 +408,29 @@ def filter_by_extension(
         Filtered list of image paths
     """
     if extensions is None:
-        extensions = SUPPORTED_EXTENSIONS
+        suffixes = _SUPPORTED_SUFFIXES
+    else:
+        suffixes = _normalize_extensions(frozenset(extensions))
 
-    # Normalize extensions to lowercase with dot
-    extensions = {
-        ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions
-    }
+    return [img for img in images if img.name.lower().endswith(suffixes)]
 
-    return [img for img in images if img.suffix.lower() in extensions]
+
+@functools.lru_cache(maxsize=32)
+def _normalize_extensions(extensions: frozenset[str]) -> tuple[str, ...]:
+    """Normalize extensions to lowercase with a leading dot, as a tuple."""
+    return tuple(
+        ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions
+    )
 
 
-def get_image_stats(images: list[Path]) -> dict[str, int | float]:
+def get_image_stats(
+    images: Sequence[Path | DiscoveredImage],
+) -> dict[str, int | float]:
     """Get statistics about discovered images.
 
     Args:
-        images: List of image paths
+        images: Image paths, or DiscoveredImage entries from scan_images()
+            (which are not stat'd again)
 
     Returns:
         Dictionary with statistics:
@@ -139,19 +447,24 @@ def get_image_stats(images: list[Path]) -> dict[str, int | float]:
             "by_extension": {},
         }
 
-    total_size = sum(img.stat().st_size for img in images)
+    # Sum sizes in one pass, then let Counter tally the extensions
+    total_size = 0
+    paths: list[Path] = []
+    for img in images:
+        if isinstance(img, DiscoveredImage):
+            img_path, size = img.path, img.size
+        else:
+            img_path, size = img, img.stat().st_size
+        total_size += size
+        paths.append(img_path)
+    by_extension = Counter(img_path.suffix.lower() for img_path in paths)
+
     total_size_mb = total_size / (1024 * 1024)
     avg_size_mb = total_size_mb / len(images)
 
-    # Count by extension
-    by_extension: dict[str, int] = {}
-    for img in images:
-        ext = img.suffix.lower()
-        by_extension[ext] = by_extension.get(ext, 0) + 1
-
     return {
         "total": len(images),
         "total_size_mb": round(total_size_mb, 2),
         "avg_size_mb": round(avg_size_mb, 2),
-        "by_extension": by_extension,
+        "by_extension": dict(by_extension),
     }
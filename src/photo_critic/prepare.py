@@ -1,18 +1,83 @@
 """Image preprocessing module for preparing images for batch API submission."""
 
 import base64
+import hashlib
 import io
+import itertools
 import logging
+import math
+import os
 import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from PIL import Image
+import PIL
+from PIL import Image, features
+
+from photo_critic._json import json_dumps, json_dumps_line, json_loads
+from photo_critic.cache import NO_CACHE_ENV, get_cache_dir
 
 logger = logging.getLogger(__name__)
 
+# Pillow-SIMD releases carry a ".postN" suffix; logged so a silent fallback
+# to stock Pillow (and its slower LANCZOS resize) shows up under --verbose
+logger.debug(
+    f"Using Pillow {PIL.__version__}"
+    f"{' (SIMD build)' if '.post' in PIL.__version__ else ''}"
+)
+
+# JPEG decode and encode are SIMD-accelerated only when Pillow is linked
+# against libjpeg-turbo (as the official wheels are); source builds may not be
+if features.check_feature("libjpeg_turbo"):
+    logger.debug(f"JPEG codec: libjpeg-turbo {features.version('libjpeg_turbo')}")
+else:
+    logger.debug("JPEG codec: libjpeg (not libjpeg-turbo); JPEG handling is slower")
+
 # Maximum long edge for API optimization (reduces tokens while preserving quality)
 MAX_LONG_EDGE = 1568
 
+# Downscales of at least twice this factor first shrink the image by an
+# integer factor with Image.reduce(), leaving LANCZOS a ratio of 2-4x; at
+# 2.0 the result is indistinguishable from a single LANCZOS pass
+RESIZE_REDUCING_GAP = 2.0
+
+# JPEG quality for encoded images; at MAX_LONG_EDGE, 85 is visually
+# indistinguishable from 95 at roughly half the bytes (and upload size)
+JPEG_QUALITY = 85
+
+# JPEGs up to this size that need no resize are uploaded unchanged
+JPEG_PASSTHROUGH_MAX_BYTES = 1024 * 1024
+
+# Modes written as JPEG without conversion (CMYK, RGBA, P etc. become RGB)
+_JPEG_MODES = frozenset({"RGB", "L"})
+
+# Encoder options passed to Image.save() (JPEG quality comes separately)
+_JPEG_SAVE_OPTIONS = {"optimize": True, "progressive": True}
+_DEFAULT_SAVE = {"quality": 95}
+_SAVE_OPTIONS = {"PNG": {}, "WEBP": _DEFAULT_SAVE}
+
+# Preprocessed images are cached on disk, keyed by file identity and the
+# settings below; bump the version whenever the encoded output changes
+PREPROCESS_CACHE_VERSION = 6
+
+# The least recently used cache entries are deleted beyond this size
+PREPROCESS_CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+# Threads used to preprocess images; Pillow releases the GIL while decoding,
+# resizing and encoding, so these run in parallel on separate cores. A few
+# more threads than cores keep every core busy while others wait on reads
+# from slow (network, spinning) disks, as the stdlib executor default does
+PREPROCESS_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# SIMD-accelerated base64 (optional; output is identical to the stdlib)
+try:
+    import pybase64
+
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
 # HEIC support
 try:
     import pillow_heif
@@ -59,8 +124,28 @@ Rules:
 - If the image is unreadable/blank/corrupt, set description "Unreadable image.", set all scores to 0, set all notes to "Unreadable image.", summary "Unreadable image.", strengths ["None","None"], improvements ["Cannot evaluate image.","Cannot evaluate image."].
 - Do not speculate about context or intent. Focus on composition, lighting, subject clarity, and technical quality."""
 
+# User message sent alongside each image (same for every provider)
+CRITIQUE_INSTRUCTION = "Please critique this photograph according to the system prompt."
+
+# Output (Pillow format, media type) by file extension; HEIC is re-encoded
+# as JPEG, and anything unlisted falls back to JPEG too
+_DEFAULT_FORMAT = ("JPEG", "image/jpeg")
+_EXT_MAP = {
+    ".jpg": _DEFAULT_FORMAT,
+    ".jpeg": _DEFAULT_FORMAT,
+    ".png": ("PNG", "image/png"),
+    ".webp": ("WEBP", "image/webp"),
+    ".heic": _DEFAULT_FORMAT,
+}
+
 DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
 
+# Runs of characters not allowed in custom IDs
+_CUSTOM_ID_STRIP = re.compile(r"[^A-Za-z0-9_-]+")
+
+# Model used when --model is not given, by provider (Anthropic is disabled)
+DEFAULT_MODELS = {"openai": DEFAULT_OPENAI_MODEL}
+
 
 def resize_image(img: Image.Image, max_long_edge: int = MAX_LONG_EDGE) -> Image.Image:
     """Resize image if long edge exceeds max_long_edge.
@@ -87,7 +172,11 @@ def resize_image(img: Image.Image, max_long_edge: int = MAX_LONG_EDGE) -> Image.
         new_width = int(width * (max_long_edge / height))
 
     logger.debug(f"Resizing image from {width}x{height} to {new_width}x{new_height}")
-    return img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    return img.resize(
+        (new_width, new_height),
+        Image.Resampling.LANCZOS,
+        reducing_gap=RESIZE_REDUCING_GAP,
+    )
 
 
 def convert_heic_to_jpeg(img: Image.Image) -> Image.Image:
@@ -104,31 +193,66 @@ def convert_heic_to_jpeg(img: Image.Image) -> Image.Image:
     return img
 
 
-def encode_image_base64(img: Image.Image, format: str = "JPEG") -> str:
+def encode_image_base64(
+    img: Image.Image, format: str = "JPEG", quality: int = JPEG_QUALITY
+) -> str:
     """Encode PIL Image to base64 string.
 
     Args:
         img: PIL Image object
         format: Output format (JPEG, PNG)
+        quality: JPEG quality; JPEGs are also written optimized and
+            progressive, which shrinks them further at no visible cost
 
     Returns:
         Base64-encoded image string
     """
     buffer = io.BytesIO()
-    img.save(buffer, format=format, quality=95)
-    buffer.seek(0)
-    return base64.b64encode(buffer.read()).decode("utf-8")
+    if format == "JPEG":
+        img.save(buffer, format=format, quality=quality, **_JPEG_SAVE_OPTIONS)
+    else:
+        img.save(buffer, format=format, **_SAVE_OPTIONS.get(format, _DEFAULT_SAVE))
+    # getbuffer() exposes the encoded bytes without copying them out first
+    with buffer.getbuffer() as view:
+        return _b64encode(view)
+
+
+def _b64encode(data: bytes | memoryview) -> str:
+    """Base64-encode bytes to a str, with pybase64 when it is installed."""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64encode(data).decode("ascii")
+    return base64.b64encode(data).decode("ascii")
+
 
+def _can_send_unchanged(img: Image.Image, path: Path) -> bool:
+    """Whether an opened (not yet loaded) image can be uploaded as-is.
 
-def preprocess_image(path: Path) -> dict[str, str] | None:
+    Small JPEGs that need no resize or mode conversion are sent
+    byte-for-byte. Files carrying EXIF or XMP metadata are still
+    re-encoded, which drops the metadata (camera details, GPS location)
+    rather than uploading it.
+    """
+    return (
+        img.format == "JPEG"
+        and max(img.size) <= MAX_LONG_EDGE
+        and img.mode in _JPEG_MODES
+        and "exif" not in img.info
+        and "xmp" not in img.info
+        and path.stat().st_size <= JPEG_PASSTHROUGH_MAX_BYTES
+    )
+
+
+def preprocess_image(path: Path, use_cache: bool = False) -> dict[str, str] | None:
     """Preprocess a single image for API submission.
 
     - Resize if needed (> 1568px long edge)
-    - Convert HEIC to JPEG
+    - Convert HEIC (and other non-RGB images re-encoded as JPEG) to RGB
     - Encode to base64
 
     Args:
         path: Path to image file
+        use_cache: Reuse (and store) the result in the on-disk preprocessing
+            cache, keyed by the file's path, size and mtime
 
     Returns:
         Dictionary with image data and metadata, or None if processing failed
@@ -139,53 +263,74 @@ def preprocess_image(path: Path) -> dict[str, str] | None:
     try:
         logger.debug(f"Preprocessing: {path}")
 
+        suffix = path.suffix.lower()
+
         # Check HEIC support
-        if path.suffix.lower() == ".heic" and not HEIC_SUPPORTED:
+        if suffix == ".heic" and not HEIC_SUPPORTED:
             logger.warning(f"Skipping HEIC image (no support): {path}")
             return None
 
+        cache_path = _preprocess_cache_path(path) if use_cache else None
+        if cache_path is not None:
+            cached = _load_preprocessed(cache_path)
+            if cached is not None:
+                logger.debug(f"Preprocessed (cached): {path}")
+                return {**cached, "path": os.fspath(path), "filename": path.name}
+
         # Open image with context manager to ensure file handle is released
         with Image.open(path) as img:
-            # Load image data into memory before exiting context
-            # This allows the file handle to be released while we continue processing
-            img.load()
-
-            # Get original dimensions
+            # Get original dimensions (before draft() can shrink them)
             original_width, original_height = img.size
 
-            # Convert HEIC to JPEG
-            is_heic = path.suffix.lower() == ".heic"
-            if is_heic:
-                img = convert_heic_to_jpeg(img)
-                format_name = "JPEG"
+            if _can_send_unchanged(img, path):
+                # Already small enough: no decode, resize or re-encode
+                base64_image = _b64encode(path.read_bytes())
                 media_type = "image/jpeg"
+                processed_width, processed_height = img.size
             else:
+                # Large JPEGs are decoded at 1/2, 1/4 or 1/8 scale by libjpeg,
+                # keeping the long edge at least MAX_LONG_EDGE for the resize
+                long_edge = max(original_width, original_height)
+                if img.format == "JPEG" and long_edge > MAX_LONG_EDGE:
+                    ratio = MAX_LONG_EDGE / long_edge
+                    img.draft(
+                        "RGB",
+                        (
+                            math.ceil(original_width * ratio),
+                            math.ceil(original_height * ratio),
+                        ),
+                    )
+
+                # Load image data into memory before exiting context
+                # This allows the file handle to be released while we continue processing
+                img.load()
+
                 # Determine format
-                if path.suffix.lower() in {".jpg", ".jpeg"}:
-                    format_name = "JPEG"
-                    media_type = "image/jpeg"
-                elif path.suffix.lower() == ".png":
-                    format_name = "PNG"
-                    media_type = "image/png"
-                elif path.suffix.lower() == ".webp":
-                    format_name = "WEBP"
-                    media_type = "image/webp"
-                else:
-                    format_name = "JPEG"
-                    media_type = "image/jpeg"
-
-            # Resize if needed
-            img = resize_image(img)
-
-            # Encode to base64
-            base64_image = encode_image_base64(img, format=format_name)
-
-            processed_width, processed_height = img.size
+                format_name, media_type = _EXT_MAP.get(suffix, _DEFAULT_FORMAT)
+
+                # Resize if needed, in place rather than into a second image
+                # (thumbnail() never enlarges; formats without draft() support
+                # get their coarse step from reduce())
+                img.thumbnail(
+                    (MAX_LONG_EDGE, MAX_LONG_EDGE),
+                    Image.Resampling.LANCZOS,
+                    reducing_gap=RESIZE_REDUCING_GAP,
+                )
+
+                # JPEG output (including HEIC and unknown types) needs RGB or L;
+                # converted after the resize, so only the small image is copied
+                if format_name == "JPEG" and img.mode not in _JPEG_MODES:
+                    img = img.convert("RGB")
+
+                # Encode to base64
+                base64_image = encode_image_base64(img, format=format_name)
+
+                processed_width, processed_height = img.size
 
         logger.debug(f"Preprocessed successfully: {path}")
 
-        return {
-            "path": str(path),
+        result = {
+            "path": os.fspath(path),
             "filename": path.name,
             "base64_data": base64_image,
             "media_type": media_type,
@@ -194,12 +339,75 @@ def preprocess_image(path: Path) -> dict[str, str] | None:
             "processed_width": processed_width,
             "processed_height": processed_height,
         }
+        if cache_path is not None:
+            _save_preprocessed(cache_path, result)
+        return result
 
     except Exception as e:
         logger.error(f"Failed to preprocess {path}: {e}")
         return None
 
 
+def _preprocess_cache_dir() -> Path:
+    """Return the directory holding preprocessed image cache entries."""
+    return get_cache_dir() / "preprocessed"
+
+
+def _preprocess_cache_path(path: Path) -> Path:
+    """Return the cache entry for the current contents of an image file."""
+    st = path.stat()
+    key = (
+        f"{path.resolve()}\0{st.st_mtime_ns}\0{st.st_size}\0"
+        f"{MAX_LONG_EDGE}\0{PREPROCESS_CACHE_VERSION}"
+    ).encode()
+    digest = hashlib.sha1(key, usedforsecurity=False).hexdigest()
+    return _preprocess_cache_dir() / f"{digest}.json"
+
+
+def _load_preprocessed(cache_path: Path) -> dict | None:
+    """Return a cached preprocessing result, or None on a miss."""
+    try:
+        data: dict = json_loads(cache_path.read_bytes())
+        # Hits are marked as recently used for pruning
+        os.utime(cache_path)
+    except (OSError, ValueError):
+        return None
+    return data
+
+
+def _save_preprocessed(cache_path: Path, result: dict) -> None:
+    """Write a preprocessing result to the cache, ignoring write failures."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_bytes(json_dumps(result))
+    except OSError as e:
+        logger.debug(f"Could not write preprocess cache {cache_path}: {e}")
+
+
+def _prune_preprocess_cache(max_bytes: int = PREPROCESS_CACHE_MAX_BYTES) -> None:
+    """Delete the least recently used cache entries beyond max_bytes."""
+    try:
+        with os.scandir(_preprocess_cache_dir()) as it:
+            entries = [(e.stat(), e.path) for e in it if e.name.endswith(".json")]
+    except OSError:
+        return
+
+    total = sum(st.st_size for st, _ in entries)
+    if total <= max_bytes:
+        return
+
+    entries.sort(key=lambda entry: entry[0].st_mtime)
+    for st, entry_path in entries:
+        try:
+            os.remove(entry_path)
+        except OSError:
+            continue
+        total -= st.st_size
+        if total <= max_bytes:
+            break
+    logger.debug(f"Pruned preprocess cache to {total} bytes")
+
+
 def build_anthropic_batch_request(
     image_data: dict[str, str], custom_id: str, model: str
 ) -> dict:
@@ -230,10 +438,7 @@ def build_anthropic_batch_request(
                                 "data": image_data["base64_data"],
                             },
                         },
-                        {
-                            "type": "text",
-                            "text": "Please critique this photograph according to the system prompt.",
-                        },
+                        {"type": "text", "text": CRITIQUE_INSTRUCTION},
                     ],
                 }
             ],
@@ -273,13 +478,7 @@ def build_openai_batch_request(
                 {
                     "role": "user",
                     "content": [
-                        {
-                            "type": "text",
-                            "text": (
-                                "Please critique this photograph according to "
-                                "the system prompt."
-                            ),
-                        },
+                        {"type": "text", "text": CRITIQUE_INSTRUCTION},
                         {
                             "type": "image_url",
                             "image_url": {"url": data_url},
@@ -318,61 +517,134 @@ def build_batch_request(
     raise ValueError(f"Unsupported provider: {provider}")
 
 
+def _build_custom_id(index: int, path: Path) -> str:
+    """Build a batch custom ID (at most 64 characters) from an image's stem."""
+    prefix = f"img_{index:04d}_"
+    stem = _CUSTOM_ID_STRIP.sub("_", path.stem).strip("_-")
+    if not stem:
+        stem = "image"
+    max_suffix_len = max(1, 64 - len(prefix))
+    return f"{prefix}{stem[:max_suffix_len]}"
+
+
+def _preprocess_with_path(
+    path: Path, use_cache: bool
+) -> tuple[Path, dict[str, str] | None]:
+    """Preprocess an image on a worker thread, keeping its path alongside."""
+    return path, preprocess_image(path, use_cache=use_cache)
+
+
+def _iter_prepared(
+    images: Iterable[Path], model: str, provider: str, use_cache: bool
+) -> Iterator[tuple[dict, dict]]:
+    """Yield (batch_request, image_metadata) for each image that preprocesses.
+
+    Images are preprocessed concurrently on PREPROCESS_WORKERS threads, and
+    are yielded in input order so custom IDs stay deterministic.
+    """
+    prepared = 0
+    idx = -1
+    use_cache = use_cache and not os.environ.get(NO_CACHE_ENV)
+
+    with ThreadPoolExecutor(max_workers=PREPROCESS_WORKERS) as pool:
+        # Results are consumed as they arrive, so each image's base64 data
+        # is released once its request (holding the data URL) is built
+        results = pool.map(_preprocess_with_path, images, itertools.repeat(use_cache))
+
+        for idx, (img_path, img_data) in enumerate(results):
+            if img_data is None:
+                logger.warning(f"Skipping image (preprocessing failed): {img_path}")
+                continue
+
+            # Build batch request
+            custom_id = _build_custom_id(idx, img_path)
+            request = build_batch_request(img_data, custom_id, model, provider)
+            # Reuse the path strings preprocess_image() already built
+            metadata = {
+                "custom_id": custom_id,
+                "path": img_data["path"],
+                "filename": img_data["filename"],
+                "original_dimensions": (
+                    img_data["original_width"],
+                    img_data["original_height"],
+                ),
+            }
+            # Don't keep the base64 string alive while the caller holds us
+            del img_data
+
+            logger.info(f"Prepared: {metadata['filename']} ({custom_id})")
+            prepared += 1
+            yield request, metadata
+
+    if use_cache:
+        _prune_preprocess_cache()
+
+    logger.info(f"Prepared {prepared} requests from {idx + 1} images")
+
+
 def prepare_batch(
-    images: list[Path],
+    images: Iterable[Path],
     model: str = DEFAULT_OPENAI_MODEL,
     provider: str = "openai",
+    use_cache: bool = True,
 ) -> tuple[list[dict], list[dict]]:
     """Prepare batch of images for API submission.
 
+    Images are preprocessed concurrently on PREPROCESS_WORKERS threads.
+    Preprocessed images are cached on disk, so unchanged files are not
+    decoded again on the next run; set PHOTO_CRITIC_NO_CACHE=1 to bypass
+    the cache.
+
     Args:
-        images: List of image paths
+        images: Image paths; any iterable works, so images can be prepared
+            while discovery is still running (see discovery.iter_images())
         model: Model to use
         provider: "openai" (Anthropic disabled)
+        use_cache: Use the on-disk preprocessing cache
 
     Returns:
         Tuple of (batch_requests, image_metadata)
         - batch_requests: List of batch request dictionaries
         - image_metadata: List of metadata for each successfully processed image
     """
-    def build_custom_id(index: int, path: Path) -> str:
-        prefix = f"img_{index:04d}_"
-        stem = re.sub(r"[^A-Za-z0-9_-]+", "_", path.stem).strip("_-")
-        if not stem:
-            stem = "image"
-        max_suffix_len = max(1, 64 - len(prefix))
-        return f"{prefix}{stem[:max_suffix_len]}"
-
     batch_requests = []
     image_metadata = []
 
-    for idx, img_path in enumerate(images):
-        # Preprocess image
-        img_data = preprocess_image(img_path)
+    for request, metadata in _iter_prepared(images, model, provider, use_cache):
+        batch_requests.append(request)
+        image_metadata.append(metadata)
 
-        if img_data is None:
-            logger.warning(f"Skipping image (preprocessing failed): {img_path}")
-            continue
+    return batch_requests, image_metadata
 
-        # Build batch request
-        custom_id = build_custom_id(idx, img_path)
-        request = build_batch_request(img_data, custom_id, model, provider)
 
-        batch_requests.append(request)
-        image_metadata.append(
-            {
-                "custom_id": custom_id,
-                "path": str(img_path),
-                "filename": img_path.name,
-                "original_dimensions": (
-                    img_data["original_width"],
-                    img_data["original_height"],
-                ),
-            }
-        )
+def prepare_batch_streaming(
+    images: Iterable[Path],
+    out_path: Path,
+    model: str = DEFAULT_OPENAI_MODEL,
+    provider: str = "openai",
+    use_cache: bool = True,
+) -> list[dict]:
+    """Prepare batch requests straight into a JSONL file.
+
+    Same as prepare_batch(), but each request is written to out_path as
+    soon as it is built instead of being kept, so memory use stays at a
+    few images regardless of how many are prepared.
+
+    Args:
+        images: Image paths (any iterable)
+        out_path: JSONL file to write, one batch request per line
+        model: Model to use
+        provider: "openai" (Anthropic disabled)
+        use_cache: Use the on-disk preprocessing cache
 
-        logger.info(f"Prepared: {img_path.name} ({custom_id})")
+    Returns:
+        List of metadata for each successfully processed image
+    """
+    image_metadata = []
 
-    logger.info(f"Prepared {len(batch_requests)} requests from {len(images)} images")
+    with open(out_path, "wb") as out:
+        for request, metadata in _iter_prepared(images, model, provider, use_cache):
+            out.write(json_dumps_line(request))
+            image_metadata.append(metadata)
 
-    return batch_requests, image_metadata
+    return image_metadata
@@ -1,13 +1,55 @@
 """Report generation module for creating JSON and Markdown outputs."""
 
-import json
+import bisect
+import heapq
+import io
 import logging
+import re
+from collections.abc import Iterable
 from datetime import datetime
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
+from photo_critic._json import json_dumps, json_loads
+
 logger = logging.getLogger(__name__)
 
+# Optional Markdown code fence (```json or ```) around a JSON payload. The
+# payload group is greedy and backs off only over the closing fence; a lazy
+# group would retry the closing-fence match at every character.
+_JSON_FENCE = re.compile(r"\s*(?:```(?:json)?)?\s*(.*[^\s`])?\s*(?:```)?\s*", re.DOTALL)
+
+# Sort key for merged results; merge_results() guarantees the field
+_BY_OVERALL_SCORE = itemgetter("overall_score")
+
+# Overall-score tiers reported in the statistics, best first
+SCORE_TIERS = (
+    "excellent (9-10)",
+    "great (8-9)",
+    "good (7-8)",
+    "average (6-7)",
+    "below_average (5-6)",
+    "poor (0-5)",
+)
+
+# Section headings for the same tiers in the Markdown report
+MARKDOWN_TIERS = (
+    "Excellent (9-10)",
+    "Great (8-9)",
+    "Good (7-8)",
+    "Average (6-7)",
+    "Below Average (5-6)",
+    "Poor (0-5)",
+)
+
+# Tier index (into SCORE_TIERS / MARKDOWN_TIERS) for each whole score 0-10
+_TIER_INDEX = (5, 5, 5, 5, 5, 4, 3, 2, 1, 0, 0)
+
+# Negated lower bound of each Markdown tier; a tier holds the negated
+# scores above the previous edge, up to and including its own
+_MARKDOWN_TIER_EDGES = (-9, -8, -7, -6, -5, 0)
+
 
 def _get_value(obj: Any, key: str, default: Any = None) -> Any:
     if isinstance(obj, dict):
@@ -16,12 +58,16 @@ def _get_value(obj: Any, key: str, default: Any = None) -> Any:
 
 
 def _extract_text_content(content: Any) -> str | None:
-    for block in content or []:
-        if _get_value(block, "type") == "text":
-            text = _get_value(block, "text")
-            if text:
-                return text
-    return None
+    # First non-empty text block; next() stops at the first match
+    return next(
+        (
+            text
+            for block in content or []
+            if _get_value(block, "type") == "text"
+            and (text := _get_value(block, "text"))
+        ),
+        None,
+    )
 
 
 def _extract_openai_text_from_choices(choices: Any) -> str | None:
@@ -32,23 +78,18 @@ def _extract_openai_text_from_choices(choices: Any) -> str | None:
     if isinstance(content, str):
         return content
     if isinstance(content, list):
-        for part in content:
-            if _get_value(part, "type") == "text":
-                text = _get_value(part, "text")
-                if text:
-                    return text
+        return _extract_text_content(content)
     return None
 
 
 def _strip_json_fence(text_content: str) -> str:
-    text_content = text_content.strip()
-    if text_content.startswith("```json"):
-        text_content = text_content[7:]
-    if text_content.startswith("```"):
-        text_content = text_content[3:]
-    if text_content.endswith("```"):
-        text_content = text_content[:-3]
-    return text_content.strip()
+    # Bare JSON objects, the usual reply, need no regex
+    if text_content.startswith("{") and text_content.endswith("}"):
+        return text_content
+    match = _JSON_FENCE.fullmatch(text_content)
+    if match is None:
+        return text_content.strip()
+    return match.group(1) or ""
 
 
 def parse_critique(result: dict[str, Any]) -> dict[str, Any] | None:
@@ -76,14 +117,14 @@ def parse_critique(result: dict[str, Any]) -> dict[str, Any] | None:
 
             # Try to parse JSON from text
             # Handle case where response might have markdown code blocks
-            critique = json.loads(_strip_json_fence(text_content))
+            critique = json_loads(_strip_json_fence(text_content))
             return critique
 
         # Fallback for OpenAI-style responses
         choices = _get_value(result_obj, "choices")
         text_content = _extract_openai_text_from_choices(choices)
         if text_content:
-            critique = json.loads(_strip_json_fence(text_content))
+            critique = json_loads(_strip_json_fence(text_content))
             return critique
 
         else:
@@ -99,28 +140,46 @@ def parse_critique(result: dict[str, Any]) -> dict[str, Any] | None:
 
 
 def merge_results(
-    batch_results: list[dict[str, Any]], image_metadata: list[dict[str, Any]]
+    batch_results: list[dict[str, Any]],
+    image_metadata: list[dict[str, Any]],
+    metadata_index: dict[str, dict[str, Any]] | None = None,
 ) -> list[dict[str, Any]]:
     """Merge batch results with image metadata.
 
     Args:
         batch_results: Results from batch API
         image_metadata: Metadata from prepare_batch()
+        metadata_index: Metadata already keyed by custom_id; built from
+            image_metadata when not given
 
     Returns:
         List of merged result dictionaries
     """
-    # Create lookup by custom_id
-    metadata_by_id = {item["custom_id"]: item for item in image_metadata}
+    pairs: Iterable[tuple[dict[str, Any], dict[str, Any]]]
+    if (
+        metadata_index is None
+        and len(batch_results) == len(image_metadata)
+        and all(
+            r["custom_id"] == m["custom_id"]
+            for r, m in zip(batch_results, image_metadata, strict=True)
+        )
+    ):
+        # Results came back in submission order: pair them up directly
+        pairs = zip(batch_results, image_metadata, strict=True)
+    else:
+        # Create lookup by custom_id
+        if metadata_index is None:
+            metadata_index = {item["custom_id"]: item for item in image_metadata}
+        pairs = (
+            (result, metadata_index.get(result["custom_id"], {}))
+            for result in batch_results
+        )
 
     merged = []
 
-    for result in batch_results:
+    for result, metadata in pairs:
         custom_id = result["custom_id"]
 
-        # Get metadata
-        metadata = metadata_by_id.get(custom_id, {})
-
         # Parse critique
         critique = parse_critique(result)
 
@@ -134,6 +193,8 @@ def merge_results(
             "filename": metadata.get("filename", "unknown"),
             "path": metadata.get("path", "unknown"),
             "original_dimensions": metadata.get("original_dimensions", (0, 0)),
+            # Default, so every merged row has a sortable score
+            "overall_score": 0,
             **critique,
         }
 
@@ -155,7 +216,12 @@ def filter_by_score(
     Returns:
         Filtered list of results
     """
-    filtered = [r for r in results if r.get("overall_score", 0) >= min_score]
+    try:
+        # merge_results() always sets the score, so subscript directly
+        filtered = [r for r in results if r["overall_score"] >= min_score]
+    except KeyError:
+        # Other callers' rows may lack it; treat a missing score as 0
+        filtered = [r for r in results if r.get("overall_score", 0) >= min_score]
     logger.info(
         f"Filtered to {len(filtered)} results with score >= {min_score} "
         f"(from {len(results)})"
@@ -183,160 +249,170 @@ def calculate_statistics(results: list[dict[str, Any]]) -> dict[str, Any]:
             "score_distribution": {},
         }
 
-    overall_scores = [r["overall_score"] for r in results]
-    composition_scores = [r["composition_score"] for r in results]
-    lighting_scores = [r["lighting_score"] for r in results]
-    subject_scores = [r["subject_score"] for r in results]
-    technical_scores = [r["technical_score"] for r in results]
-
-    # Calculate score distribution (tiers)
-    distribution = {
-        "excellent (9-10)": len([s for s in overall_scores if s >= 9]),
-        "great (8-9)": len([s for s in overall_scores if 8 <= s < 9]),
-        "good (7-8)": len([s for s in overall_scores if 7 <= s < 8]),
-        "average (6-7)": len([s for s in overall_scores if 6 <= s < 7]),
-        "below_average (5-6)": len([s for s in overall_scores if 5 <= s < 6]),
-        "poor (0-5)": len([s for s in overall_scores if s < 5]),
-    }
+    # Sum every score and count the overall-score tiers in a single pass
+    overall_total = composition_total = lighting_total = 0.0
+    subject_total = technical_total = 0.0
+    tier_counts = [0] * len(SCORE_TIERS)
+
+    for r in results:
+        overall = r["overall_score"]
+        overall_total += overall
+        composition_total += r["composition_score"]
+        lighting_total += r["lighting_score"]
+        subject_total += r["subject_score"]
+        technical_total += r["technical_score"]
 
+        tier_counts[_TIER_INDEX[min(max(int(overall), 0), 10)]] += 1
+
+    count = len(results)
     return {
-        "total_images": len(results),
-        "mean_overall_score": round(sum(overall_scores) / len(overall_scores), 2),
-        "mean_composition_score": round(
-            sum(composition_scores) / len(composition_scores), 2
-        ),
-        "mean_lighting_score": round(sum(lighting_scores) / len(lighting_scores), 2),
-        "mean_subject_score": round(sum(subject_scores) / len(subject_scores), 2),
-        "mean_technical_score": round(sum(technical_scores) / len(technical_scores), 2),
-        "score_distribution": distribution,
+        "total_images": count,
+        "mean_overall_score": round(overall_total / count, 2),
+        "mean_composition_score": round(composition_total / count, 2),
+        "mean_lighting_score": round(lighting_total / count, 2),
+        "mean_subject_score": round(subject_total / count, 2),
+        "mean_technical_score": round(technical_total / count, 2),
+        "score_distribution": dict(zip(SCORE_TIERS, tier_counts, strict=True)),
     }
 
 
-def generate_json_report(results: list[dict[str, Any]], output_path: Path) -> None:
+def generate_json_report(
+    results: list[dict[str, Any]],
+    output_path: Path,
+    stats: dict[str, Any] | None = None,
+    generated_at: datetime | None = None,
+) -> None:
     """Generate JSON report.
 
     Args:
         results: List of merged result dictionaries
         output_path: Path to output JSON file
+        stats: Precomputed calculate_statistics() output for results
+        generated_at: Report timestamp (defaults to now)
     """
     # Sort by overall_score descending
-    sorted_results = sorted(
-        results, key=lambda x: x.get("overall_score", 0), reverse=True
-    )
+    sorted_results = sorted(results, key=_BY_OVERALL_SCORE, reverse=True)
 
     # Calculate statistics
-    stats = calculate_statistics(sorted_results)
-
-    # Build report
-    report = {
-        "generated_at": datetime.now().isoformat(),
-        "statistics": stats,
-        "results": sorted_results,
-    }
-
-    # Write to file
-    with open(output_path, "w") as f:
-        json.dump(report, f, indent=2)
+    if stats is None:
+        stats = calculate_statistics(sorted_results)
+
+    if generated_at is None:
+        generated_at = datetime.now()
+
+    # Stream the report one result at a time, so only a single encoded
+    # record is held in memory. Nested values are re-indented to their
+    # depth, which gives the same bytes as encoding the whole report.
+    with open(output_path, "wb") as f:
+        f.write(b'{\n  "generated_at": ')
+        f.write(json_dumps(generated_at.isoformat()))
+        f.write(b',\n  "statistics": ')
+        f.write(json_dumps(stats, indent=True).replace(b"\n", b"\n  "))
+        f.write(b',\n  "results": [')
+        separator = b"\n    "
+        for result in sorted_results:
+            f.write(separator)
+            f.write(json_dumps(result, indent=True).replace(b"\n", b"\n    "))
+            separator = b",\n    "
+        f.write(b"\n  ]\n}" if sorted_results else b"]\n}")
 
     logger.info(f"JSON report written to: {output_path}")
 
 
-def generate_markdown_report(results: list[dict[str, Any]], output_path: Path) -> None:
+def generate_markdown_report(
+    results: list[dict[str, Any]],
+    output_path: Path,
+    stats: dict[str, Any] | None = None,
+    generated_at: datetime | None = None,
+) -> None:
     """Generate Markdown report.
 
     Args:
         results: List of merged result dictionaries
         output_path: Path to output Markdown file
+        stats: Precomputed calculate_statistics() output for results
+        generated_at: Report timestamp (defaults to now)
     """
-    # Sort by overall_score descending
-    sorted_results = sorted(
-        results, key=lambda x: x.get("overall_score", 0), reverse=True
-    )
-
     # Calculate statistics
-    stats = calculate_statistics(sorted_results)
-
-    # Build markdown
-    lines = [
-        "# Photo Critic Report",
-        "",
-        f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-        "",
-        "## Statistics",
-        "",
-        f"- **Total Images:** {stats['total_images']}",
-        f"- **Mean Overall Score:** {stats['mean_overall_score']}/10",
-        f"- **Mean Composition Score:** {stats['mean_composition_score']}/10",
-        f"- **Mean Lighting Score:** {stats['mean_lighting_score']}/10",
-        f"- **Mean Subject Score:** {stats['mean_subject_score']}/10",
-        f"- **Mean Technical Score:** {stats['mean_technical_score']}/10",
-        "",
-        "### Score Distribution",
-        "",
-    ]
+    if stats is None:
+        stats = calculate_statistics(results)
+
+    if generated_at is None:
+        generated_at = datetime.now()
+
+    # Build markdown in one buffer. Every write starts with the line
+    # separator so the output matches joining the lines with "\n".
+    buf = io.StringIO()
+    write = buf.write
+    write(
+        "# Photo Critic Report\n"
+        "\n"
+        f"**Generated:** {generated_at.strftime('%Y-%m-%d %H:%M:%S')}\n"
+        "\n"
+        "## Statistics\n"
+        "\n"
+        f"- **Total Images:** {stats['total_images']}\n"
+        f"- **Mean Overall Score:** {stats['mean_overall_score']}/10\n"
+        f"- **Mean Composition Score:** {stats['mean_composition_score']}/10\n"
+        f"- **Mean Lighting Score:** {stats['mean_lighting_score']}/10\n"
+        f"- **Mean Subject Score:** {stats['mean_subject_score']}/10\n"
+        f"- **Mean Technical Score:** {stats['mean_technical_score']}/10\n"
+        "\n"
+        "### Score Distribution\n"
+    )
 
     for tier, count in stats["score_distribution"].items():
-        lines.append(f"- **{tier}:** {count}")
-
-    lines.extend(["", "---", "", "## Detailed Results", ""])
-
-    # Group by tier
-    tiers = [
-        ("Excellent (9-10)", 9, 10),
-        ("Great (8-9)", 8, 9),
-        ("Good (7-8)", 7, 8),
-        ("Average (6-7)", 6, 7),
-        ("Below Average (5-6)", 5, 6),
-        ("Poor (0-5)", 0, 5),
-    ]
-
-    for tier_name, min_score, max_score in tiers:
-        tier_results = [
-            r
-            for r in sorted_results
-            if min_score <= r.get("overall_score", 0) < max_score
-            or (max_score == 10 and r.get("overall_score", 0) == 10)
-        ]
+        write(f"\n- **{tier}:** {count}")
 
+    write("\n\n---\n\n## Detailed Results\n")
+
+    # Sort once (linear when generate_report has already sorted); each tier
+    # is then a contiguous run, found by binary search on the negated
+    # scores, which are ascending
+    ordered = sorted(results, key=_BY_OVERALL_SCORE, reverse=True)
+    negated = [-r["overall_score"] for r in ordered]
+    start = bisect.bisect_left(negated, -10)
+
+    for tier_name, edge in zip(MARKDOWN_TIERS, _MARKDOWN_TIER_EDGES, strict=True):
+        end = bisect.bisect_right(negated, edge, lo=start)
+        tier_results = ordered[start:end]
+        start = end
         if not tier_results:
             continue
 
-        lines.extend(["", f"### {tier_name}", ""])
+        write(f"\n\n### {tier_name}\n")
 
         for result in tier_results:
-            lines.extend(
-                [
-                    f"#### {result['filename']} - **{result['overall_score']}/10**",
-                    "",
-                    f"**Path:** `{result['path']}`",
-                    "",
-                    f"**Description:** {result.get('description', 'N/A')}",
-                    "",
-                    f"**Summary:** {result['summary']}",
-                    "",
-                    "**Scores:**",
-                    f"- Composition: {result['composition_score']}/10 - {result['composition_notes']}",
-                    f"- Lighting: {result['lighting_score']}/10 - {result['lighting_notes']}",
-                    f"- Subject: {result['subject_score']}/10 - {result['subject_notes']}",
-                    f"- Technical: {result['technical_score']}/10 - {result['technical_notes']}",
-                    "",
-                    "**Strengths:**",
-                ]
+            write(
+                f"\n#### {result['filename']} - **{result['overall_score']}/10**\n"
+                "\n"
+                f"**Path:** `{result['path']}`\n"
+                "\n"
+                f"**Description:** {result.get('description', 'N/A')}\n"
+                "\n"
+                f"**Summary:** {result['summary']}\n"
+                "\n"
+                "**Scores:**\n"
+                f"- Composition: {result['composition_score']}/10 - {result['composition_notes']}\n"
+                f"- Lighting: {result['lighting_score']}/10 - {result['lighting_notes']}\n"
+                f"- Subject: {result['subject_score']}/10 - {result['subject_notes']}\n"
+                f"- Technical: {result['technical_score']}/10 - {result['technical_notes']}\n"
+                "\n"
+                "**Strengths:**"
             )
 
             for strength in result.get("strengths", []):
-                lines.append(f"- {strength}")
+                write(f"\n- {strength}")
 
-            lines.extend(["", "**Improvements:**"])
+            write("\n\n**Improvements:**")
 
             for improvement in result.get("improvements", []):
-                lines.append(f"- {improvement}")
+                write(f"\n- {improvement}")
 
-            lines.append("")
+            write("\n")
 
-    # Write to file
-    with open(output_path, "w") as f:
-        f.write("\n".join(lines))
+    # Encode once; the report is UTF-8 regardless of the locale
+    output_path.write_bytes(buf.getvalue().encode("utf-8"))
 
     logger.info(f"Markdown report written to: {output_path}")
 
@@ -347,6 +423,7 @@ def generate_report(
     output_path: Path,
     format: str = "json",
     min_score: float = 0.0,
+    top_k: int | None = None,
 ) -> None:
     """Generate final report.
 
@@ -356,6 +433,7 @@ def generate_report(
         output_path: Path to output file
         format: Output format ('json', 'markdown', or 'both')
         min_score: Minimum overall_score to include
+        top_k: Keep only this many of the best-scoring results
 
     Raises:
         ValueError: If format is invalid
@@ -374,13 +452,25 @@ def generate_report(
         logger.warning("No results to write")
         return
 
+    # Sort and compute statistics once for both writers; their own sorts
+    # are then a single linear pass over already ordered results. Both
+    # reports also carry the same timestamp.
+    if top_k and len(results) > top_k:
+        # A partial sort when only the best top_k are kept
+        logger.info(f"Keeping the {top_k} best of {len(results)} results")
+        results = heapq.nlargest(top_k, results, key=_BY_OVERALL_SCORE)
+    else:
+        results.sort(key=_BY_OVERALL_SCORE, reverse=True)
+    stats = calculate_statistics(results)
+    generated_at = datetime.now()
+
     # Generate reports
     if format in {"json", "both"}:
         json_path = output_path.with_suffix(".json")
-        generate_json_report(results, json_path)
+        generate_json_report(results, json_path, stats, generated_at)
 
     if format in {"markdown", "both"}:
         md_path = output_path.with_suffix(".md")
-        generate_markdown_report(results, md_path)
+        generate_markdown_report(results, md_path, stats, generated_at)
 
     logger.info("Report generation complete")
@@ -1,5 +1,125 @@
 """Tests for batch module."""
 
+import asyncio
+import json
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from photo_critic import batch
+from photo_critic.batch import (
+    MAX_POLL_INTERVAL,
+    OpenAIBatchClient,
+    _extract_openai_text,
+    _next_delay,
+    _poll,
+    _TokenBucket,
+)
+from photo_critic.cache import ResultCache, request_key
+
+
+class FakeBatches:
+    """Fake OpenAI batches resource returning a scripted status sequence."""
+
+    def __init__(self, statuses: list[str]) -> None:
+        self.statuses = statuses
+        self.retrieve_calls = 0
+        self.created: list[dict[str, Any]] = []
+
+    def create(self, **kwargs: Any) -> SimpleNamespace:
+        self.created.append(kwargs)
+        return SimpleNamespace(id=f"batch_{len(self.created)}", status="validating")
+
+    def retrieve(self, batch_id: str) -> SimpleNamespace:
+        status = self.statuses[min(self.retrieve_calls, len(self.statuses) - 1)]
+        self.retrieve_calls += 1
+        return SimpleNamespace(
+            id=batch_id,
+            status=status,
+            request_counts={"total": 1, "completed": 0, "failed": 0},
+            output_file_id="file_out" if status == "completed" else None,
+        )
+
+
+class FakeStreamedContent:
+    """Fake streamed file content exposing iter_lines()."""
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.lines_read = 0
+
+    def iter_lines(self) -> Iterator[str]:
+        for line in self.text.splitlines():
+            self.lines_read += 1
+            yield line
+
+
+class FakeFiles:
+    """Fake OpenAI files resource serving scripted output content."""
+
+    def __init__(self, output_text: str = "") -> None:
+        self.content_obj = FakeStreamedContent(output_text)
+        self.with_streaming_response = SimpleNamespace(content=self._content)
+        self.uploads: list[tuple[str, bytes]] = []
+
+    def create(self, file: tuple[str, Any], purpose: str) -> SimpleNamespace:
+        name, handle = file
+        self.uploads.append((name, handle.read()))
+        return SimpleNamespace(id=f"file_{len(self.uploads)}")
+
+    @contextmanager
+    def _content(self, file_id: str) -> Iterator[FakeStreamedContent]:
+        yield self.content_obj
+
+
+def make_output_line(custom_id: str, text: str) -> str:
+    """Create one line of an OpenAI batch output file."""
+    record = {
+        "custom_id": custom_id,
+        "response": {
+            "status_code": 200,
+            "body": {"choices": [{"message": {"content": text}}]},
+        },
+    }
+    return json.dumps(record)
+
+
+def make_request(custom_id: str, body: dict[str, Any] | None = None) -> dict[str, Any]:
+    """Create a well-formed batch request line."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": body if body is not None else {},
+    }
+
+
+def make_client(statuses: list[str], output_text: str = "") -> OpenAIBatchClient:
+    """Create an OpenAI batch client backed by a fake API."""
+    client = OpenAIBatchClient(api_key="test-key")
+    client.client = SimpleNamespace(  # type: ignore
+        batches=FakeBatches(statuses), files=FakeFiles(output_text)
+    )
+    return client
+
+
+@pytest.fixture
+def sleeps(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Record sleep durations instead of sleeping."""
+    recorded: list[float] = []
+
+    def fake_sleep(seconds: float) -> None:
+        recorded.append(seconds)
+
+    monkeypatch.setattr(batch, "_sleep", fake_sleep)
+    return recorded
+
 
 def test_batch_client_init_placeholder() -> None:
     """Placeholder test for BatchClient initialization."""
@@ -17,3 +137,777 @@ def test_poll_batch_placeholder() -> None:
     """Placeholder test for poll_batch."""
     # TODO: Implement tests
     pass
+
+
+class TestNextDelay:
+    """Tests for _next_delay backoff helper."""
+
+    def test_first_attempt_within_base(self) -> None:
+        """Test that the first delay is between half and the full base."""
+        for _ in range(50):
+            delay = _next_delay(0, base=10)
+            assert 5 <= delay <= 10
+
+    def test_delay_grows_exponentially(self) -> None:
+        """Test that the delay bound doubles with each attempt."""
+        for _ in range(50):
+            assert 20 <= _next_delay(2, base=10) <= 40
+
+    def test_delay_is_capped(self) -> None:
+        """Test that the delay never exceeds the cap."""
+        for _ in range(50):
+            assert _next_delay(20, base=30) <= MAX_POLL_INTERVAL
+
+
+class TestExtractOpenAIText:
+    """Tests for _extract_openai_text."""
+
+    def test_string_content(self) -> None:
+        """Test that plain string content is returned as-is."""
+        body = {"choices": [{"message": {"content": "hello"}}]}
+        assert _extract_openai_text(body) == "hello"
+
+    def test_list_content(self) -> None:
+        """Test that the first text part is returned from list content."""
+        body = {
+            "choices": [
+                {
+                    "message": {
+                        "content": [
+                            {"type": "image_url"},
+                            {"type": "text", "text": "hello"},
+                        ]
+                    }
+                }
+            ]
+        }
+        assert _extract_openai_text(body) == "hello"
+
+    def test_missing_content(self) -> None:
+        """Test that missing choices or content return None."""
+        assert _extract_openai_text({}) is None
+        assert _extract_openai_text({"choices": [{"message": {}}]}) is None
+
+
+class FakeStatusSource:
+    """Minimal status source returning scripted states."""
+
+    def __init__(self, states: list[str]) -> None:
+        self.states = states
+        self.calls = 0
+
+    def get_batch_status(self, batch_id: str) -> dict[str, Any]:
+        state = self.states[min(self.calls, len(self.states) - 1)]
+        self.calls += 1
+        counts = dict.fromkeys(
+            ("processing", "succeeded", "errored", "canceled", "expired"), 0
+        )
+        return {"id": batch_id, "state": state, "request_counts": counts}
+
+
+class TestPoll:
+    """Tests for the shared _poll loop."""
+
+    def test_returns_on_done_state(self, sleeps: list[float]) -> None:
+        """Test that any configured done state ends polling."""
+        source = FakeStatusSource(["running", "running", "ended"])
+        status = _poll(
+            source,
+            "b",
+            state_key="state",
+            done_states={"ended"},
+            failed_states={"failed"},
+            poll_interval=1,
+            timeout=100,
+        )
+
+        assert status["state"] == "ended"
+        assert source.calls == 3
+        assert len(sleeps) == 2
+
+    def test_raises_on_failed_state(self, sleeps: list[float]) -> None:
+        """Test that failed states raise with the state in the message."""
+        source = FakeStatusSource(["running", "gone"])
+        with pytest.raises(Exception, match="failed with status: gone"):
+            _poll(
+                source,
+                "b",
+                state_key="state",
+                done_states={"ended"},
+                failed_states={"gone"},
+                poll_interval=1,
+                timeout=100,
+            )
+
+
+class TestOpenAIPollBatch:
+    """Tests for OpenAIBatchClient.poll_batch."""
+
+    def test_poll_returns_on_completed(self, sleeps: list[float]) -> None:
+        """Test that polling stops once the batch completes."""
+        client = make_client(["in_progress", "in_progress", "completed"])
+        status = client.poll_batch("batch_1", poll_interval=1)
+
+        assert status["provider_status"] == "completed"
+        assert len(sleeps) == 2
+
+    def test_poll_backs_off_while_unchanged(self, sleeps: list[float]) -> None:
+        """Test that delays grow while the status does not change."""
+        client = make_client(["in_progress"] * 4 + ["completed"])
+        client.poll_batch("batch_1", poll_interval=1)
+
+        # Attempts 0..3 have bounds 1, 2, 4, 8 -> lower bounds 0.5, 1, 2, 4
+        assert sleeps[3] >= 4
+
+    def test_poll_resets_backoff_on_transition(self, sleeps: list[float]) -> None:
+        """Test that a status change resets the backoff."""
+        statuses: list[Any] = ["validating"] * 3 + ["in_progress", "completed"]
+        client = make_client(statuses)
+        client.poll_batch("batch_1", poll_interval=1)
+
+        assert sleeps[3] <= 1
+
+    def test_poll_sleep_clamped_to_timeout(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the final sleep ends at the deadline, not past it."""
+        now = [1000.0]
+        recorded: list[float] = []
+
+        def fake_sleep(seconds: float) -> None:
+            recorded.append(seconds)
+            now[0] += seconds
+
+        monkeypatch.setattr(batch, "_monotonic", lambda: now[0])
+        monkeypatch.setattr(batch, "_sleep", fake_sleep)
+
+        client = make_client(["in_progress", "in_progress", "completed"])
+        status = client.poll_batch("batch_1", poll_interval=100, timeout=10)
+
+        assert status["provider_status"] == "completed"
+        assert recorded == [batch.FIRST_POLL_DELAY, 10 - batch.FIRST_POLL_DELAY]
+
+    def test_poll_times_out(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that polling raises once the deadline has passed."""
+        now = [1000.0]
+
+        def fake_sleep(seconds: float) -> None:
+            now[0] += seconds
+
+        monkeypatch.setattr(batch, "_monotonic", lambda: now[0])
+        monkeypatch.setattr(batch, "_sleep", fake_sleep)
+
+        client = make_client(["in_progress"])
+        with pytest.raises(TimeoutError):
+            client.poll_batch("batch_1", poll_interval=1, timeout=10)
+
+    def test_progress_logged_after_interval(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        sleeps: list[float],
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Test that progress is logged once per interval of waiting."""
+        # A quick first re-check, then 100s sleeps: progress is logged
+        # after 305s and another 300s
+        monkeypatch.setattr(batch, "_next_delay", lambda attempt, base, cap: 100.0)
+        client = make_client(["in_progress"] * 8 + ["completed"])
+        with caplog.at_level("INFO", logger="photo_critic.batch"):
+            client.poll_batch("batch_1", poll_interval=100)
+
+        progress = [r for r in caplog.records if "Batch progress" in r.message]
+        assert len(sleeps) == 8
+        assert len(progress) == 2
+
+    def test_poll_backoff_respects_max_interval(self, sleeps: list[float]) -> None:
+        """Test that max_interval caps the backoff."""
+        client = make_client(["in_progress"] * 6 + ["completed"])
+        client.poll_batch("batch_1", poll_interval=5, max_interval=8)
+
+        assert max(sleeps) <= 8
+
+    def test_first_recheck_is_quick(self, sleeps: list[float]) -> None:
+        """Test that the second status check doesn't wait a full interval."""
+        client = make_client(["validating", "in_progress", "completed"])
+        client.poll_batch("batch_1", poll_interval=60)
+
+        assert sleeps[0] == batch.FIRST_POLL_DELAY
+        assert sleeps[1] >= 30  # poll_interval with at most 50% jitter
+
+    def test_poll_raises_on_failed(self, sleeps: list[float]) -> None:
+        """Test that a failed batch raises."""
+        client = make_client(["in_progress", "failed"])
+        with pytest.raises(Exception, match="failed"):
+            client.poll_batch("batch_1", poll_interval=1)
+
+
+class TestOpenAIBatchStatusCache:
+    """Tests for terminal status caching in get_batch_status."""
+
+    def test_terminal_status_is_cached(self) -> None:
+        """Test that a completed status skips further API calls."""
+        client = make_client(["completed"])
+        first = client.get_batch_status("batch_1")
+        second = client.get_batch_status("batch_1")
+
+        assert first == second
+        assert client.client.batches.retrieve_calls == 1
+
+    def test_returned_status_is_a_copy(self) -> None:
+        """Test that mutating a returned status leaves the cache intact."""
+        client = make_client(["completed"])
+        first = client.get_batch_status("batch_1")
+        first["provider_status"] = "mangled"
+        first["request_counts"]["succeeded"] = -1
+
+        second = client.get_batch_status("batch_1")
+        assert second["provider_status"] == "completed"
+        assert second["request_counts"]["succeeded"] == 0
+
+    def test_terminal_status_evicts_ttl_entry(self) -> None:
+        """Test that finished batches don't linger in the TTL cache."""
+        client = make_client(["in_progress", "completed"])
+        client.get_batch_status("batch_1")
+        assert "batch_1" in client._status_cache
+
+        client.get_batch_status("batch_1")
+        assert "batch_1" not in client._status_cache
+
+    def test_terminal_cache_is_bounded(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the oldest terminal statuses are evicted."""
+        monkeypatch.setattr(batch, "TERMINAL_STATUS_CACHE_SIZE", 2)
+        client = make_client(["completed"])
+        for batch_id in ("batch_1", "batch_2", "batch_3"):
+            client.get_batch_status(batch_id)
+
+        assert list(client._terminal_cache) == ["batch_2", "batch_3"]
+
+    def test_non_terminal_status_not_cached(self) -> None:
+        """Test that in-progress statuses are always re-fetched."""
+        client = make_client(["in_progress", "completed"])
+        client.get_batch_status("batch_1")
+        status = client.get_batch_status("batch_1")
+
+        assert status["provider_status"] == "completed"
+        assert client.client.batches.retrieve_calls == 2
+
+    def test_refresh_bypasses_cache(self) -> None:
+        """Test that refresh=True forces an API call."""
+        client = make_client(["completed"])
+        client.get_batch_status("batch_1")
+        client.get_batch_status("batch_1", refresh=True)
+
+        assert client.client.batches.retrieve_calls == 2
+
+    def test_ttl_reuses_recent_status(self) -> None:
+        """Test that a fresh non-terminal status is reused within the TTL."""
+        client = make_client(["in_progress", "completed"])
+        client.get_batch_status("batch_1")
+        status = client.get_batch_status("batch_1", ttl_ms=60_000)
+
+        assert status["provider_status"] == "in_progress"
+        assert client.client.batches.retrieve_calls == 1
+
+    def test_ttl_expired_refetches(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a status older than the caller's TTL is re-fetched."""
+        now = [1000.0]
+        monkeypatch.setattr(batch, "_monotonic", lambda: now[0])
+        client = make_client(["in_progress", "completed"])
+
+        client.get_batch_status("batch_1")
+        now[0] += 5.0
+        status = client.get_batch_status("batch_1", ttl_ms=1000)
+
+        assert status["provider_status"] == "completed"
+        assert client.client.batches.retrieve_calls == 2
+
+
+class TestOpenAIBatchResults:
+    """Tests for streaming batch result retrieval."""
+
+    def test_get_batch_results_parses_records(self) -> None:
+        """Test that output lines are parsed into result dictionaries."""
+        output = "\n".join(
+            [make_output_line("img_0000", '{"a": 1}'), "", make_output_line("x", "")]
+        )
+        client = make_client(["completed"], output)
+        results = client.get_batch_results("batch_1")
+
+        assert len(results) == 2
+        assert results[0]["custom_id"] == "img_0000"
+        assert results[0]["result"]["type"] == "succeeded"
+        assert results[0]["result"]["message"]["content"][0]["text"] == '{"a": 1}'
+        assert results[1]["result"]["type"] == "errored"
+
+    def test_passed_status_skips_status_fetch(self) -> None:
+        """Test that a status from poll_batch() is used as-is."""
+        client = make_client(["in_progress"], make_output_line("a", "{}"))
+        status = {"provider_status": "completed", "output_file_id": "file_out"}
+
+        results = client.get_batch_results("batch_1", status=status)
+
+        assert [r["custom_id"] for r in results] == ["a"]
+        assert client.client.batches.retrieve_calls == 0
+
+    def test_iter_batch_results_is_lazy(self) -> None:
+        """Test that records are read from the stream on demand."""
+        output = "\n".join(make_output_line(f"img_{i}", "{}") for i in range(5))
+        client = make_client(["completed"], output)
+        results = client.iter_batch_results("batch_1")
+
+        first = next(results)
+        assert first["custom_id"] == "img_0"
+        assert client.client.files.content_obj.lines_read == 1
+
+    def test_get_batch_results_requires_completed(self) -> None:
+        """Test that results cannot be fetched before completion."""
+        client = make_client(["in_progress"])
+        with pytest.raises(ValueError, match="Batch not completed"):
+            client.get_batch_results("batch_1")
+
+
+class TestOpenAISubmitBatch:
+    """Tests for OpenAIBatchClient.submit_batch."""
+
+    def test_submit_uploads_jsonl_payload(self) -> None:
+        """Test that requests are uploaded as one JSON object per line."""
+        client = make_client(["validating"])
+        requests = [make_request("a", {}), make_request("b", {})]
+
+        batch_id = client.submit_batch(requests)
+
+        assert batch_id == "batch_1"
+        name, payload = client.client.files.uploads[0]
+        assert name == "batch.jsonl"
+        lines = payload.decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == requests
+        assert client.client.batches.created[0]["input_file_id"] == "file_1"
+
+    def test_submit_empty_batch_raises(self) -> None:
+        """Test that an empty batch is rejected."""
+        client = make_client(["validating"])
+        with pytest.raises(ValueError, match="empty batch"):
+            client.submit_batch([])
+
+    def test_missing_keys_rejected_before_upload(self) -> None:
+        """Test that a malformed request fails before any API call."""
+        client = make_client(["validating"])
+        requests = [make_request("a"), {"custom_id": "b", "body": {}}]
+
+        with pytest.raises(ValueError, match=r"requests\[1\] missing method, url"):
+            client.submit_batch(requests)
+        assert client.client.files.uploads == []
+
+    def test_duplicate_custom_id_rejected(self) -> None:
+        """Test that reused custom IDs are rejected."""
+        client = make_client(["validating"])
+        with pytest.raises(ValueError, match="duplicate custom_id: a"):
+            client.submit_batch([make_request("a"), make_request("a")])
+        assert client.client.files.uploads == []
+
+    def test_oversized_payload_rejected(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that payloads over the file size limit are not uploaded."""
+        monkeypatch.setattr(batch, "OPENAI_MAX_FILE_BYTES", 100)
+        client = make_client(["validating"])
+        requests = [make_request(str(i), {"text": "x" * 40}) for i in range(3)]
+
+        with pytest.raises(ValueError, match="too large"):
+            client.submit_batch(requests)
+        assert client.client.files.uploads == []
+
+
+class TestOpenAISubmitAndPoll:
+    """Tests for OpenAIBatchClient.submit_and_poll."""
+
+    def test_returns_results(self, sleeps: list[float]) -> None:
+        """Test that one call submits, waits, and fetches the results."""
+        client = make_client(
+            ["validating", "completed"], output_text=make_output_line("a", "{}")
+        )
+
+        results = client.submit_and_poll([make_request("a")], poll_interval=30)
+
+        assert [r["custom_id"] for r in results] == ["a"]
+        assert len(client.client.files.uploads) == 1
+        assert sleeps == [batch.FIRST_POLL_DELAY]
+
+
+class FakeAsyncResource:
+    """Fake async files/batches resource tracking concurrent calls."""
+
+    def __init__(self, fail_marker: bytes | None = None) -> None:
+        self.calls: list[Any] = []
+        self.active = 0
+        self.max_active = 0
+        self.fail_marker = fail_marker
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if "file" in kwargs:
+            payload = kwargs["file"][1].read()
+            if self.fail_marker is not None and self.fail_marker in payload:
+                raise RuntimeError("upload rejected")
+            self.calls.append(payload)
+        else:
+            self.calls.append(kwargs["input_file_id"])
+        return SimpleNamespace(id=f"id_{len(self.calls)}")
+
+
+class FakeAsyncClient:
+    """Fake AsyncOpenAI client usable as an async context manager."""
+
+    def __init__(self, files: FakeAsyncResource, batches: FakeAsyncResource) -> None:
+        self.files = files
+        self.batches = batches
+
+    async def __aenter__(self) -> "FakeAsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+
+class TestOpenAISubmitBatches:
+    """Tests for concurrent sub-batch submission."""
+
+    def test_submit_batches_chunks_requests(self) -> None:
+        """Test that requests are split into chunks and submitted."""
+        client = make_client(["validating"])
+        files, batches_ = FakeAsyncResource(), FakeAsyncResource()
+        client._make_async_client = lambda: FakeAsyncClient(  # type: ignore
+            files, batches_
+        )
+        requests = [make_request(str(i)) for i in range(5)]
+
+        batch_ids = asyncio.run(
+            client.submit_batches(requests, chunk_size=2, concurrency=2)
+        )
+
+        assert len(batch_ids) == 3
+        assert sorted(len(p.splitlines()) for p in files.calls) == [1, 2, 2]
+        assert files.max_active <= 2
+
+    def test_partial_failure_reports_created_batches(
+        self, caplog: pytest.LogCaptureFixture
+    ) -> None:
+        """Test that a failed chunk still surfaces the batches created."""
+        client = make_client(["validating"])
+        files = FakeAsyncResource(fail_marker=b'"custom_id":"4"')
+        batches_ = FakeAsyncResource()
+        client._make_async_client = lambda: FakeAsyncClient(  # type: ignore
+            files, batches_
+        )
+        requests = [make_request(str(i)) for i in range(5)]
+
+        with pytest.raises(RuntimeError, match="upload rejected") as excinfo:
+            asyncio.run(client.submit_batches(requests, chunk_size=2))
+
+        # The two healthy chunks were still created and are reported
+        assert len(batches_.calls) == 2
+        assert "Batches already created" in excinfo.value.__notes__[0]
+        assert "Batches already created" in caplog.text
+
+    def test_cached_requests_are_skipped(self, tmp_path: Path) -> None:
+        """Test that cache hits are not uploaded by submit_batches."""
+        client = make_client(["validating"])
+        client.cache = ResultCache(tmp_path / "cache.sqlite3")
+        cached = make_request("0", {"n": 0})
+        client.cache.put(
+            request_key(cached), "0", {"custom_id": "0", "result": {"type": "x"}}
+        )
+        files, batches_ = FakeAsyncResource(), FakeAsyncResource()
+        client._make_async_client = lambda: FakeAsyncClient(  # type: ignore
+            files, batches_
+        )
+        requests = [cached] + [make_request(str(i), {"n": i}) for i in (1, 2)]
+
+        batch_ids = asyncio.run(client.submit_batches(requests, chunk_size=1))
+
+        assert len(batch_ids) == 2
+        assert all(b'"custom_id":"0"' not in p for p in files.calls)
+        hits, _ = client.cache.load_batch(batch_ids[0]) or ([], {})
+        assert [h["custom_id"] for h in hits] == ["0"]
+
+
+class TestTokenBucket:
+    """Tests for the _TokenBucket rate limiter."""
+
+    def test_acquire_within_budget_does_not_sleep(self, sleeps: list[float]) -> None:
+        """Test that requests under the limit are not delayed."""
+        bucket = _TokenBucket(rpm=60)
+        for _ in range(60):
+            bucket.acquire()
+        assert sleeps == []
+
+    def test_acquire_waits_when_drained(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an empty bucket waits for the refill interval."""
+        now = [1000.0]
+        recorded: list[float] = []
+
+        def fake_sleep(seconds: float) -> None:
+            recorded.append(seconds)
+            now[0] += seconds
+
+        monkeypatch.setattr(batch, "_monotonic", lambda: now[0])
+        monkeypatch.setattr(batch, "_sleep", fake_sleep)
+
+        bucket = _TokenBucket(rpm=60)
+        for _ in range(61):
+            bucket.acquire()
+
+        assert recorded == [pytest.approx(1.0)]
+
+    def test_acquire_async_shares_budget(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that async acquisition draws from the same tokens."""
+        now = [1000.0]
+        monkeypatch.setattr(batch, "_monotonic", lambda: now[0])
+
+        bucket = _TokenBucket(rpm=2)
+        bucket.acquire()
+        asyncio.run(bucket.acquire_async())
+        assert bucket.request_tokens < 1
+
+    def test_clock_behind_last_update_does_not_wait(
+        self, monkeypatch: pytest.MonkeyPatch, sleeps: list[float]
+    ) -> None:
+        """Test that a clock reading before last_update never drains tokens."""
+        bucket = _TokenBucket(rpm=60)
+        monkeypatch.setattr(batch, "_monotonic", lambda: bucket.last_update - 5000)
+        bucket.acquire()
+        assert sleeps == []
+
+    def test_invalid_rpm_raises(self) -> None:
+        """Test that a non-positive rate is rejected."""
+        with pytest.raises(ValueError, match="rpm"):
+            _TokenBucket(rpm=0)
+
+
+class TestClientCache:
+    """Tests for the shared client used by convenience functions."""
+
+    def test_same_key_reuses_client(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that repeated lookups return the same client."""
+        monkeypatch.setattr(batch, "_CLIENT_CACHE", {})
+        first = batch._get_or_create_client("openai", "test-key")
+        second = batch._get_or_create_client("OpenAI", "test-key")
+        assert first is second
+
+    def test_different_key_creates_client(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that distinct API keys get distinct clients."""
+        monkeypatch.setattr(batch, "_CLIENT_CACHE", {})
+        first = batch._get_or_create_client("openai", "key-a")
+        second = batch._get_or_create_client("openai", "key-b")
+        assert first is not second
+
+
+def _post(
+    port: int, payload: dict[str, Any], headers: dict[str, str] | None = None
+) -> int:
+    """POST a JSON payload to the local webhook receiver."""
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{port}/",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", **(headers or {})},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def fake_unwrap(body: bytes, headers: dict[str, str]) -> dict[str, Any]:
+    """Stand-in for the SDK's verified unwrap."""
+    if headers.get("X-Test-Signature") == "bad":
+        raise ValueError("invalid signature")
+    return json.loads(body)
+
+
+def make_webhook_client(statuses: list[str]) -> OpenAIBatchClient:
+    """Create a fake-backed client whose SDK exposes webhooks.unwrap."""
+    client = make_client(statuses)
+    client.client.webhooks = SimpleNamespace(  # type: ignore
+        unwrap=lambda body, headers, secret: fake_unwrap(body, headers)
+    )
+    return client
+
+
+class TestBatchWebhookReceiver:
+    """Tests for the webhook receiver used by wait_for_batch."""
+
+    def test_terminal_event_for_batch_sets_done(self) -> None:
+        """Test that a matching batch.completed event wakes the waiter."""
+        receiver = batch._BatchWebhookReceiver("batch_1", fake_unwrap, port=0)
+        with receiver:
+            event = {"type": "batch.completed", "data": {"id": "batch_1"}}
+            assert _post(receiver.port, event) == 200
+            assert receiver.wait(5)
+        assert receiver.event_type == "batch.completed"
+
+    def test_unverified_delivery_rejected(self) -> None:
+        """Test that payloads failing verification get a 400."""
+        receiver = batch._BatchWebhookReceiver("batch_1", fake_unwrap, port=0)
+        with receiver:
+            event = {"type": "batch.completed", "data": {"id": "batch_1"}}
+            headers = {"X-Test-Signature": "bad"}
+            assert _post(receiver.port, event, headers) == 400
+            assert not receiver.wait(0.1)
+
+    def test_other_batch_is_ignored(self) -> None:
+        """Test that events for a different batch are acknowledged only."""
+        receiver = batch._BatchWebhookReceiver("batch_1", fake_unwrap, port=0)
+        with receiver:
+            event = {"type": "batch.completed", "data": {"id": "batch_2"}}
+            assert _post(receiver.port, event) == 200
+            assert not receiver.wait(0.1)
+
+
+class TestOpenAIWaitForBatch:
+    """Tests for OpenAIBatchClient.wait_for_batch."""
+
+    def test_invalid_mode_raises(self) -> None:
+        """Test that unknown wait modes are rejected."""
+        client = make_client(["completed"])
+        with pytest.raises(ValueError, match="wait mode"):
+            client.wait_for_batch("batch_1", via="carrier-pigeon")
+
+    def test_webhook_returns_if_already_completed(self) -> None:
+        """Test that a finished batch returns without waiting for an event."""
+        client = make_webhook_client(["completed"])
+        status = client.wait_for_batch(
+            "batch_1", via="webhook", port=0, webhook_secret="whsec_test"
+        )
+        assert status["provider_status"] == "completed"
+
+    def test_webhook_event_then_status(
+        self, monkeypatch: pytest.MonkeyPatch, sleeps: list[float]
+    ) -> None:
+        """Test that the status is re-checked once the event arrives."""
+        monkeypatch.setattr(batch._BatchWebhookReceiver, "wait", lambda s, t: True)
+        client = make_webhook_client(["in_progress", "completed"])
+        status = client.wait_for_batch(
+            "batch_1", via="webhook", port=0, webhook_secret="whsec_test"
+        )
+
+        assert status["provider_status"] == "completed"
+        assert client.client.batches.retrieve_calls == 2
+
+    def test_falls_back_to_polling(
+        self, monkeypatch: pytest.MonkeyPatch, sleeps: list[float]
+    ) -> None:
+        """Test that polling is used when the receiver cannot start."""
+
+        def fail(*args: Any, **kwargs: Any) -> None:
+            raise OSError("address in use")
+
+        monkeypatch.setattr(batch, "_BatchWebhookReceiver", fail)
+        client = make_webhook_client(["in_progress", "completed"])
+        status = client.wait_for_batch(
+            "batch_1", via="webhook", poll_interval=1, webhook_secret="whsec_test"
+        )
+
+        assert status["provider_status"] == "completed"
+        assert len(sleeps) == 1
+
+    def test_missing_secret_falls_back_to_polling(
+        self, monkeypatch: pytest.MonkeyPatch, sleeps: list[float]
+    ) -> None:
+        """Test that no receiver starts when deliveries can't be verified."""
+        monkeypatch.delenv("OPENAI_WEBHOOK_SECRET", raising=False)
+        monkeypatch.setattr(batch, "_BatchWebhookReceiver", None)
+        client = make_webhook_client(["in_progress", "completed"])
+        status = client.wait_for_batch("batch_1", via="webhook", poll_interval=1)
+
+        assert status["provider_status"] == "completed"
+        assert len(sleeps) == 1
+
+    def test_sdk_without_webhooks_falls_back_to_polling(
+        self, monkeypatch: pytest.MonkeyPatch, sleeps: list[float]
+    ) -> None:
+        """Test that older SDKs without client.webhooks poll instead."""
+        monkeypatch.setattr(batch, "_BatchWebhookReceiver", None)
+        client = make_client(["in_progress", "completed"])
+        status = client.wait_for_batch(
+            "batch_1", via="webhook", poll_interval=1, webhook_secret="whsec_test"
+        )
+
+        assert status["provider_status"] == "completed"
+        assert len(sleeps) == 1
+
+
+class TestOpenAIResultCache:
+    """Tests for result caching in OpenAIBatchClient."""
+
+    def test_cached_requests_are_not_resubmitted(self, tmp_path: Path) -> None:
+        """Test that only misses are uploaded and hits are returned."""
+        cache = ResultCache(tmp_path / "cache.sqlite3")
+        cached_request = make_request("a", {"n": 1})
+        cache.put(
+            request_key(cached_request),
+            "a",
+            {"custom_id": "a", "result": {"type": "succeeded"}},
+        )
+
+        client = make_client(["completed"], make_output_line("b", '{"x": 1}'))
+        client.cache = cache
+        batch_id = client.submit_batch([cached_request, make_request("b", {"n": 2})])
+
+        _, payload = client.client.files.uploads[0]
+        assert [json.loads(line)["custom_id"] for line in payload.splitlines()] == ["b"]
+        results = client.get_batch_results(batch_id)
+        assert [r["custom_id"] for r in results] == ["a", "b"]
+        assert cache.get(request_key(make_request("b", {"n": 2})))
+
+    def test_partly_cached_batch_resumes_in_new_client(self, tmp_path: Path) -> None:
+        """Test that another client on the same cache restores the hits."""
+        path = tmp_path / "cache.sqlite3"
+        cached_request = make_request("a", {"n": 1})
+        fresh_request = make_request("b", {"n": 2})
+        submitter = make_client(["validating"])
+        submitter.cache = ResultCache(path)
+        submitter.cache.put(
+            request_key(cached_request),
+            "a",
+            {"custom_id": "a", "result": {"type": "succeeded"}},
+        )
+        batch_id = submitter.submit_batch([cached_request, fresh_request])
+        submitter.cache.close()
+
+        client = make_client(["completed"], make_output_line("b", '{"x": 1}'))
+        client.cache = ResultCache(path)
+        results = client.get_batch_results(batch_id)
+
+        assert [r["custom_id"] for r in results] == ["a", "b"]
+        assert client.cache.get(request_key(fresh_request))
+
+    def test_cached_batch_id_without_cache_raises(self) -> None:
+        """Test that a local cached_* ID is never sent to the API."""
+        client = make_client(["completed"])
+        with pytest.raises(ValueError, match="result cache"):
+            client.get_batch_status(f"{batch.CACHED_BATCH_PREFIX}abc")
+        assert client.client.batches.retrieve_calls == 0
+
+    def test_fully_cached_batch_skips_api(self, tmp_path: Path) -> None:
+        """Test that a batch of cache hits never calls the API."""
+        cache = ResultCache(tmp_path / "cache.sqlite3")
+        request = make_request("a", {"n": 1})
+        cache.put(
+            request_key(request),
+            "a",
+            {"custom_id": "a", "result": {"type": "succeeded"}},
+        )
+
+        client = make_client(["in_progress"])
+        client.cache = cache
+        batch_id = client.submit_batch([request])
+
+        assert batch_id.startswith(batch.CACHED_BATCH_PREFIX)
+        assert client.poll_batch(batch_id)["request_counts"]["succeeded"] == 1
+        assert len(client.get_batch_results(batch_id)) == 1
+        assert client.client.files.uploads == []
+        assert client.client.batches.retrieve_calls == 0
@@ -0,0 +1,149 @@
+"""Tests for cache module."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from photo_critic.cache import ResultCache, get_cache_dir, request_key
+
+
+def make_request(custom_id: str, text: str = "critique") -> dict[str, Any]:
+    """Create a minimal batch request."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {"model": "gpt-4o-mini", "messages": [{"content": text}]},
+    }
+
+
+def make_result(custom_id: str) -> dict[str, Any]:
+    """Create a parsed batch result record."""
+    return {"custom_id": custom_id, "result": {"type": "succeeded"}}
+
+
+class TestGetCacheDir:
+    """Tests for get_cache_dir function."""
+
+    def test_uses_xdg_cache_home(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        """Test that XDG_CACHE_HOME is honored."""
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert get_cache_dir() == tmp_path / "photo-critic"
+
+    def test_defaults_to_home(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the fallback to ~/.cache."""
+        monkeypatch.delenv("XDG_CACHE_HOME", raising=False)
+        assert get_cache_dir() == Path.home() / ".cache" / "photo-critic"
+
+
+class TestRequestKey:
+    """Tests for request_key function."""
+
+    def test_ignores_custom_id(self) -> None:
+        """Test that the same request under another ID shares a key."""
+        assert request_key(make_request("a")) == request_key(make_request("b"))
+
+    def test_ignores_key_order(self) -> None:
+        """Test that dictionary ordering does not change the key."""
+        request = make_request("a")
+        reordered = dict(reversed(list(request.items())))
+        assert request_key(request) == request_key(reordered)
+
+    def test_content_changes_key(self) -> None:
+        """Test that a different payload produces a different key."""
+        assert request_key(make_request("a", "x")) != request_key(
+            make_request("a", "y")
+        )
+
+
+class TestResultCache:
+    """Tests for ResultCache class."""
+
+    def test_put_then_get(self, tmp_path: Path) -> None:
+        """Test that stored results can be read back."""
+        cache = ResultCache(tmp_path / "cache.sqlite3")
+        cache.put("k", "a", make_result("a"))
+        assert cache.get("k") == make_result("a")
+
+    def test_persists_across_instances(self, tmp_path: Path) -> None:
+        """Test that results survive reopening the database."""
+        path = tmp_path / "cache.sqlite3"
+        ResultCache(path).put("k", "a", make_result("a"))
+        assert ResultCache(path).get("k") == make_result("a")
+
+    def test_partition_splits_hits_and_misses(self, tmp_path: Path) -> None:
+        """Test that cached requests are relabeled and misses returned."""
+        cache = ResultCache(tmp_path / "cache.sqlite3")
+        cached = make_request("old_id", "x")
+        cache.put(request_key(cached), "old_id", make_result("old_id"))
+
+        hits, misses, keys = cache.partition(
+            [make_request("new_id", "x"), make_request("other", "y")]
+        )
+
+        assert [h["custom_id"] for h in hits] == ["new_id"]
+        assert [m["custom_id"] for m in misses] == ["other"]
+        assert keys == {
+            "new_id": request_key(make_request("new_id", "x")),
+            "other": request_key(make_request("other", "y")),
+        }
+
+    def test_put_many(self, tmp_path: Path) -> None:
+        """Test that several records are stored in one call."""
+        cache = ResultCache(tmp_path / "cache.sqlite3")
+        cache.put_many([("k1", "a", make_result("a")), ("k2", "b", make_result("b"))])
+        assert cache.get("k1") == make_result("a")
+        assert cache.get("k2") == make_result("b")
+
+    def test_load_batch_from_another_instance(self, tmp_path: Path) -> None:
+        """Test that a recorded batch can be rebuilt by a new process."""
+        path = tmp_path / "cache.sqlite3"
+        with ResultCache(path) as cache:
+            cache.put("k1", "old", make_result("old"))
+            cache.record_batch("batch_1", {"a": "k1", "b": "k2"}, {"a"})
+
+        with ResultCache(path) as cache:
+            loaded = cache.load_batch("batch_1")
+
+        assert loaded == ([make_result("a")], {"b": "k2"})
+
+    def test_load_unknown_batch(self, tmp_path: Path) -> None:
+        """Test that unrecorded batches return None."""
+        cache = ResultCache(tmp_path / "cache.sqlite3")
+        assert cache.load_batch("batch_1") is None
+
+    def test_read_only_does_not_store(self, tmp_path: Path) -> None:
+        """Test that read-only caches ignore writes."""
+        cache = ResultCache(tmp_path / "cache.sqlite3", policy="read-only")
+        cache.put("k", "a", make_result("a"))
+        assert cache.get("k") is None
+
+    def test_write_only_does_not_read(self, tmp_path: Path) -> None:
+        """Test that write-only caches never serve hits."""
+        path = tmp_path / "cache.sqlite3"
+        cache = ResultCache(path, policy="write-only")
+        cache.put("k", "a", make_result("a"))
+        assert cache.get("k") is None
+        assert ResultCache(path).get("k") == make_result("a")
+
+    def test_replay_raises_on_miss(self, tmp_path: Path) -> None:
+        """Test that replay mode refuses to submit anything."""
+        cache = ResultCache(tmp_path / "cache.sqlite3", policy="replay")
+        with pytest.raises(ValueError, match="replay"):
+            cache.partition([make_request("a")])
+
+    def test_disabled_creates_nothing(self, tmp_path: Path) -> None:
+        """Test that a disabled cache never touches disk."""
+        path = tmp_path / "sub" / "cache.sqlite3"
+        cache = ResultCache(path, policy="disabled")
+        cache.put("k", "a", make_result("a"))
+        assert cache.get("k") is None
+        assert not path.parent.exists()
+
+    def test_invalid_policy_raises(self, tmp_path: Path) -> None:
+        """Test that unknown policies are rejected."""
+        with pytest.raises(ValueError, match="Invalid cache policy"):
+            ResultCache(tmp_path / "cache.sqlite3", policy="sometimes")
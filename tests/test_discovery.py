@@ -1,17 +1,34 @@
 """Tests for discovery module."""
 
+import os
+import threading
 from pathlib import Path
 
 import pytest
 
+from photo_critic import discovery
 from photo_critic.discovery import (
     MIN_FILE_SIZE,
+    DiscoveredImage,
     discover_images,
     filter_by_extension,
     get_image_stats,
+    iter_images,
+    scan_images,
 )
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(
+    monkeypatch: pytest.MonkeyPatch, tmp_path_factory: pytest.TempPathFactory
+) -> Path:
+    """Keep the discovery cache out of the user's cache directory."""
+    cache_home = tmp_path_factory.mktemp("xdg-cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    monkeypatch.delenv(discovery.NO_CACHE_ENV, raising=False)
+    return cache_home
+
+
 class TestDiscoverImages:
     """Tests for discover_images function."""
 
@@ -80,6 +97,16 @@ class TestDiscoverImages:
         assert len(result) == 1
         assert result[0].name == "photo.jpg"
 
+    def test_discover_images_prunes_nested_excluded_dirs(self, tmp_path: Path) -> None:
+        """Test that nothing below an excluded directory is returned."""
+        deep = tmp_path / "album" / "thumbnails" / "large"
+        deep.mkdir(parents=True)
+        (deep / "thumb.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+        (tmp_path / "album" / "photo.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+
+        result = discover_images(tmp_path, recursive=True)
+        assert [p.name for p in result] == ["photo.jpg"]
+
     def test_discover_images_recursive(self, tmp_path: Path) -> None:
         """Test recursive discovery in subdirectories."""
         # Create subdirectory with image
@@ -105,6 +132,16 @@ class TestDiscoverImages:
         result = discover_images(tmp_path, max_images=3)
         assert len(result) == 3
 
+    def test_discover_images_max_images_keeps_newest(self, tmp_path: Path) -> None:
+        """Test that max_images keeps the newest images, not the first found."""
+        for i in range(6):
+            photo = tmp_path / f"photo{i}.jpg"
+            photo.write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+            os.utime(photo, (1000 + i, 1000 + i))
+
+        result = discover_images(tmp_path, max_images=2)
+        assert [p.name for p in result] == ["photo5.jpg", "photo4.jpg"]
+
     def test_discover_images_case_insensitive_extensions(self, tmp_path: Path) -> None:
         """Test that extension matching is case-insensitive."""
         (tmp_path / "photo.JPG").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
@@ -113,6 +150,145 @@ class TestDiscoverImages:
         result = discover_images(tmp_path)
         assert len(result) == 2
 
+    def test_discover_images_uses_last_extension(self, tmp_path: Path) -> None:
+        """Test that only the final suffix of a file name is matched."""
+        for name in ["photo.jpg.txt", "photojpg", "photo.tar.jpg"]:
+            (tmp_path / name).write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+
+        result = discover_images(tmp_path)
+        assert [p.name for p in result] == ["photo.tar.jpg"]
+
+
+class TestScanImages:
+    """Tests for scan_images function."""
+
+    def test_scan_images_skips_directories_named_like_images(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that a directory with an image extension is not returned."""
+        (tmp_path / "album.jpg").mkdir()
+        (tmp_path / "photo.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+
+        result = scan_images(tmp_path)
+        assert [image.path.name for image in result] == ["photo.jpg"]
+
+    def test_scan_images_returns_size_and_mtime(self, tmp_path: Path) -> None:
+        """Test that entries carry the stat data read during the scan."""
+        photo = tmp_path / "photo.jpg"
+        photo.write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+
+        result = scan_images(tmp_path)
+
+        stat = photo.stat()
+        assert result == [DiscoveredImage(photo, stat.st_size, stat.st_mtime)]
+
+    def test_scan_images_parallel_stat(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        """Test that the thread pool path filters like the serial one."""
+        monkeypatch.setattr(discovery, "PARALLEL_STAT_THRESHOLD", 1)
+        for i in range(5):
+            (tmp_path / f"photo{i}.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+        (tmp_path / "small.jpg").write_bytes(b"x" * 100)
+
+        result = scan_images(tmp_path)
+        assert sorted(image.path.name for image in result) == [
+            f"photo{i}.jpg" for i in range(5)
+        ]
+
+    def test_scan_images_newest_first(self, tmp_path: Path) -> None:
+        """Test that entries are sorted by modification time, newest first."""
+        for i, mtime in enumerate([100, 300, 200]):
+            photo = tmp_path / f"photo{i}.jpg"
+            photo.write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+            os.utime(photo, (mtime, mtime))
+
+        result = scan_images(tmp_path)
+        assert [image.path.name for image in result] == [
+            "photo1.jpg",
+            "photo2.jpg",
+            "photo0.jpg",
+        ]
+
+
+class TestIterImages:
+    """Tests for iter_images function."""
+
+    def test_iter_images_yields_filtered_images(self, tmp_path: Path) -> None:
+        """Test that streaming applies the same filters as scan_images."""
+        for i in range(3):
+            (tmp_path / f"photo{i}.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+        (tmp_path / "small.jpg").write_bytes(b"x" * 100)
+        (tmp_path / "notes.txt").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+
+        names = sorted(image.path.name for image in iter_images(tmp_path))
+        assert names == ["photo0.jpg", "photo1.jpg", "photo2.jpg"]
+
+    def test_iter_images_respects_max_images(self, tmp_path: Path) -> None:
+        """Test that streaming stops after max_images."""
+        for i in range(5):
+            (tmp_path / f"photo{i}.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+
+        assert len(list(iter_images(tmp_path, max_images=2))) == 2
+
+    def test_iter_images_stops_when_abandoned(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        """Test that closing the generator early stops the scan thread."""
+        monkeypatch.setattr(discovery, "STREAM_QUEUE_SIZE", 1)
+        for i in range(5):
+            (tmp_path / f"photo{i}.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+
+        images = iter_images(tmp_path)
+        next(images)
+        images.close()
+
+        assert not any(t.name == "photo-critic-scan" for t in threading.enumerate())
+
+    def test_iter_images_nonexistent_path(self, tmp_path: Path) -> None:
+        """Test that a missing directory raises before any scanning."""
+        with pytest.raises(ValueError, match="Path does not exist"):
+            iter_images(tmp_path / "missing")
+
+
+class TestDiscoveryCache:
+    """Tests for the on-disk discovery cache."""
+
+    def test_repeat_scan_is_served_from_cache(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+    ) -> None:
+        """Test that an unchanged directory is not stat'd again."""
+        (tmp_path / "photo.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+        first = scan_images(tmp_path)
+
+        def fail(*args: object) -> None:
+            raise AssertionError("directory was rescanned")
+
+        monkeypatch.setattr(discovery, "_stat_candidates", fail)
+        assert scan_images(tmp_path) == first
+
+    def test_new_file_invalidates_cache(self, tmp_path: Path) -> None:
+        """Test that adding a file to a scanned directory forces a rescan."""
+        subdir = tmp_path / "sub"
+        subdir.mkdir()
+        (tmp_path / "a.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+        assert len(scan_images(tmp_path, recursive=True)) == 1
+
+        (subdir / "b.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+        os.utime(subdir, ns=(0, 1))
+
+        assert len(scan_images(tmp_path, recursive=True)) == 2
+
+    def test_no_cache_env_skips_cache(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, isolated_cache: Path
+    ) -> None:
+        """Test that PHOTO_CRITIC_NO_CACHE bypasses reads and writes."""
+        monkeypatch.setenv(discovery.NO_CACHE_ENV, "1")
+        (tmp_path / "photo.jpg").write_bytes(b"x" * (MIN_FILE_SIZE + 1000))
+
+        scan_images(tmp_path)
+        assert not list(isolated_cache.rglob("discovery-*.json"))
+
 
 class TestFilterByExtension:
     """Tests for filter_by_extension function."""
@@ -185,3 +361,15 @@ class TestGetImageStats:
         result = get_image_stats(files)
         assert result["by_extension"][".jpg"] == 3
         assert result["by_extension"][".png"] == 1
+
+    def test_get_image_stats_uses_scanned_sizes(self) -> None:
+        """Test that DiscoveredImage sizes are used without touching disk."""
+        images = [
+            DiscoveredImage(Path("/missing/a.jpg"), 1024 * 1024, 0.0),
+            DiscoveredImage(Path("/missing/b.JPG"), 1024 * 1024, 0.0),
+        ]
+
+        result = get_image_stats(images)
+
+        assert result["total_size_mb"] == 2.0
+        assert result["by_extension"] == {".jpg": 2}
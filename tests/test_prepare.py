@@ -2,10 +2,15 @@
 
 import base64
 import io
+import json
+import os
 from pathlib import Path
 
+import pytest
 from PIL import Image
 
+from photo_critic import prepare
+from photo_critic.cache import NO_CACHE_ENV
 from photo_critic.prepare import (
     MAX_LONG_EDGE,
     PHOTO_CRITIC_SYSTEM_PROMPT,
@@ -13,6 +18,7 @@ from photo_critic.prepare import (
     convert_heic_to_jpeg,
     encode_image_base64,
     prepare_batch,
+    prepare_batch_streaming,
     preprocess_image,
     resize_image,
 )
@@ -27,6 +33,17 @@ def create_test_image(
     return path
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache(
+    monkeypatch: pytest.MonkeyPatch, tmp_path_factory: pytest.TempPathFactory
+) -> Path:
+    """Keep the preprocessing cache out of the user's cache directory."""
+    cache_home = tmp_path_factory.mktemp("xdg-cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    monkeypatch.delenv(NO_CACHE_ENV, raising=False)
+    return cache_home
+
+
 class TestResizeImage:
     """Tests for resize_image function."""
 
@@ -112,6 +129,28 @@ class TestEncodeImageBase64:
         reopened = Image.open(io.BytesIO(decoded))
         assert reopened.size == (100, 100)
 
+    def test_encode_matches_stdlib_base64(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the optional pybase64 path matches the stdlib output."""
+        img = Image.new("RGB", (100, 100), color="blue")
+        result = encode_image_base64(img)
+        monkeypatch.setattr(prepare, "PYBASE64_AVAILABLE", False)
+        assert encode_image_base64(img) == result
+
+    def test_encode_jpeg_is_progressive(self) -> None:
+        """Test that JPEGs are written progressive."""
+        img = Image.new("RGB", (100, 100), color="blue")
+        decoded = base64.b64decode(encode_image_base64(img))
+        assert Image.open(io.BytesIO(decoded)).info.get("progressive")
+
+    def test_encode_quality_controls_size(self) -> None:
+        """Test that a lower JPEG quality produces a smaller payload."""
+        img = Image.effect_noise((256, 256), 64).convert("RGB")
+        low = encode_image_base64(img, quality=50)
+        high = encode_image_base64(img, quality=95)
+        assert len(low) < len(high)
+
 
 class TestPreprocessImage:
     """Tests for preprocess_image function."""
@@ -147,6 +186,57 @@ class TestPreprocessImage:
         assert result["processed_width"] == MAX_LONG_EDGE
         assert result["processed_height"] < 3000
 
+    def test_preprocess_resizes_large_portrait_png(self, tmp_path: Path) -> None:
+        """Test that tall non-JPEG images are resized to the long edge."""
+        img_path = create_test_image(tmp_path / "tall.png", 2000, 3000, format="PNG")
+        result = preprocess_image(img_path)
+
+        assert result is not None
+        assert result["processed_height"] == MAX_LONG_EDGE
+        assert result["processed_width"] == round(2000 * (MAX_LONG_EDGE / 3000))
+
+    def test_preprocess_drafts_very_large_jpeg(self, tmp_path: Path) -> None:
+        """Test that a JPEG decoded at reduced scale still resizes exactly."""
+        img_path = create_test_image(tmp_path / "huge.jpg", 6400, 4800)
+        result = preprocess_image(img_path)
+
+        assert result is not None
+        assert result["original_width"] == 6400
+        assert result["original_height"] == 4800
+        assert result["processed_width"] == MAX_LONG_EDGE
+        assert result["processed_height"] == int(4800 * (MAX_LONG_EDGE / 6400))
+
+    def test_preprocess_small_jpeg_is_sent_unchanged(self, tmp_path: Path) -> None:
+        """Test that a small JPEG without metadata is not re-encoded."""
+        img_path = create_test_image(tmp_path / "small.jpg", 800, 600)
+        result = preprocess_image(img_path)
+
+        assert result is not None
+        assert base64.b64decode(result["base64_data"]) == img_path.read_bytes()
+        assert result["processed_width"] == 800
+
+    def test_preprocess_jpeg_with_exif_is_reencoded(self, tmp_path: Path) -> None:
+        """Test that EXIF metadata is not uploaded with a small JPEG."""
+        img_path = tmp_path / "exif.jpg"
+        exif = Image.Exif()
+        exif[0x010F] = "Camera Maker"
+        Image.new("RGB", (800, 600), color="red").save(img_path, exif=exif)
+        result = preprocess_image(img_path)
+
+        assert result is not None
+        decoded = base64.b64decode(result["base64_data"])
+        assert "exif" not in Image.open(io.BytesIO(decoded)).info
+
+    def test_preprocess_cmyk_jpeg_is_sent_as_rgb(self, tmp_path: Path) -> None:
+        """Test that JPEG output is converted to RGB when needed."""
+        img_path = tmp_path / "cmyk.jpg"
+        Image.new("CMYK", (200, 100)).save(img_path, format="JPEG")
+        result = preprocess_image(img_path)
+
+        assert result is not None
+        decoded = base64.b64decode(result["base64_data"])
+        assert Image.open(io.BytesIO(decoded)).mode == "RGB"
+
     def test_preprocess_invalid_file(self, tmp_path: Path) -> None:
         """Test that invalid files return None."""
         invalid_path = tmp_path / "invalid.jpg"
@@ -160,6 +250,57 @@ class TestPreprocessImage:
         assert result is None
 
 
+class TestPreprocessCache:
+    """Tests for the on-disk preprocessing cache."""
+
+    def test_cached_result_skips_decoding(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an unchanged file is served from the cache."""
+        img_path = create_test_image(tmp_path / "photo.jpg")
+        first = preprocess_image(img_path, use_cache=True)
+
+        def fail_open(*args: object, **kwargs: object) -> None:
+            raise AssertionError("image decoded again")
+
+        monkeypatch.setattr(prepare.Image, "open", fail_open)
+        assert preprocess_image(img_path, use_cache=True) == first
+
+    def test_modified_file_is_reprocessed(self, tmp_path: Path) -> None:
+        """Test that changing a file invalidates its cache entry."""
+        img_path = create_test_image(tmp_path / "photo.jpg", 800, 600)
+        preprocess_image(img_path, use_cache=True)
+
+        create_test_image(img_path, 400, 300)
+        os.utime(img_path, ns=(0, 1))
+        result = preprocess_image(img_path, use_cache=True)
+
+        assert result is not None
+        assert result["original_width"] == 400
+
+    def test_no_cache_env_skips_cache(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, isolated_cache: Path
+    ) -> None:
+        """Test that PHOTO_CRITIC_NO_CACHE disables the cache."""
+        monkeypatch.setenv(NO_CACHE_ENV, "1")
+        prepare_batch([create_test_image(tmp_path / "photo.jpg")])
+        assert not (isolated_cache / "photo-critic" / "preprocessed").exists()
+
+    def test_prune_removes_least_recently_used(self, tmp_path: Path) -> None:
+        """Test that pruning deletes the oldest entries first."""
+        paths = [create_test_image(tmp_path / f"photo{i}.jpg") for i in range(3)]
+        entries = []
+        for i, img_path in enumerate(paths):
+            preprocess_image(img_path, use_cache=True)
+            entry = prepare._preprocess_cache_path(img_path)
+            os.utime(entry, (1000 + i, 1000 + i))
+            entries.append(entry)
+
+        prepare._prune_preprocess_cache(max_bytes=entries[2].stat().st_size)
+
+        assert [entry.exists() for entry in entries] == [False, False, True]
+
+
 class TestBuildBatchRequest:
     """Tests for build_batch_request function."""
 
@@ -224,6 +365,16 @@ class TestPrepareBatch:
         assert len(requests) == 3
         assert len(metadata) == 3
 
+    def test_prepare_batch_preserves_input_order(self, tmp_path: Path) -> None:
+        """Test that parallel preprocessing keeps IDs in input order."""
+        paths = [create_test_image(tmp_path / f"photo{i}.jpg") for i in range(6)]
+
+        _, metadata = prepare_batch(iter(paths))
+
+        assert [m["custom_id"] for m in metadata] == [
+            f"img_{i:04d}_photo{i}" for i in range(6)
+        ]
+
     def test_prepare_batch_skips_invalid(self, tmp_path: Path) -> None:
         """Test that invalid images are skipped."""
         valid_path = create_test_image(tmp_path / "valid.jpg")
@@ -242,3 +393,31 @@ class TestPrepareBatch:
         requests, _ = prepare_batch([img_path], model="claude-opus-4-20250514")
 
         assert requests[0]["params"]["model"] == "claude-opus-4-20250514"
+
+
+class TestPrepareBatchStreaming:
+    """Tests for prepare_batch_streaming function."""
+
+    def test_writes_one_request_per_line(self, tmp_path: Path) -> None:
+        """Test that requests are written as JSONL matching prepare_batch."""
+        paths = [create_test_image(tmp_path / f"photo{i}.jpg") for i in range(2)]
+        out_path = tmp_path / "batch.jsonl"
+
+        metadata = prepare_batch_streaming(paths, out_path)
+        requests, expected_metadata = prepare_batch(paths)
+
+        lines = out_path.read_text().splitlines()
+        assert [json.loads(line) for line in lines] == requests
+        assert metadata == expected_metadata
+
+    def test_skips_invalid(self, tmp_path: Path) -> None:
+        """Test that images that fail preprocessing are left out."""
+        valid_path = create_test_image(tmp_path / "valid.jpg")
+        invalid_path = tmp_path / "invalid.jpg"
+        invalid_path.write_text("not an image")
+        out_path = tmp_path / "batch.jsonl"
+
+        metadata = prepare_batch_streaming([valid_path, invalid_path], out_path)
+
+        assert [m["filename"] for m in metadata] == ["valid.jpg"]
+        assert len(out_path.read_text().splitlines()) == 1
@@ -1,10 +1,13 @@
 """Tests for report module."""
 
 import json
+from datetime import datetime
 from pathlib import Path
 
 import pytest
 
+from photo_critic import report
+from photo_critic._json import json_dumps, json_loads
 from photo_critic.report import (
     calculate_statistics,
     filter_by_score,
@@ -18,15 +21,37 @@ from photo_critic.report import (
 
 def make_succeeded_result(custom_id: str, critique: dict) -> dict:
     """Create a mock succeeded API result."""
+    text = json_dumps(critique).decode("utf-8")
     return {
         "custom_id": custom_id,
         "result": {
             "type": "succeeded",
-            "message": {"content": [{"type": "text", "text": json.dumps(critique)}]},
+            "message": {"content": [{"type": "text", "text": text}]},
         },
     }
 
 
+def read_report(path: Path) -> bytes:
+    """Read a generated report, failing if it is missing or empty."""
+    data = path.read_bytes()
+    assert data, f"{path} is empty"
+    return data
+
+
+# Text fields shared by every sample critique (only the scores vary).
+# Each critique gets its own dict but shares these lists, which no test
+# mutates.
+_SAMPLE_CRITIQUE_TEXT = {
+    "composition_notes": "Good use of rule of thirds",
+    "lighting_notes": "Natural lighting works well",
+    "subject_notes": "Clear subject matter",
+    "technical_notes": "Sharp focus throughout",
+    "summary": "A well-composed photograph with good technical execution.",
+    "strengths": ["Strong composition", "Good lighting"],
+    "improvements": ["Could benefit from more contrast"],
+}
+
+
 def make_sample_critique(
     overall: float = 7.5,
     composition: float = 8.0,
@@ -38,35 +63,38 @@ def make_sample_critique(
     return {
         "overall_score": overall,
         "composition_score": composition,
-        "composition_notes": "Good use of rule of thirds",
         "lighting_score": lighting,
-        "lighting_notes": "Natural lighting works well",
         "subject_score": subject,
-        "subject_notes": "Clear subject matter",
         "technical_score": technical,
-        "technical_notes": "Sharp focus throughout",
-        "summary": "A well-composed photograph with good technical execution.",
-        "strengths": ["Strong composition", "Good lighting"],
-        "improvements": ["Could benefit from more contrast"],
+        **_SAMPLE_CRITIQUE_TEXT,
     }
 
 
+@pytest.fixture(scope="module")
+def sample_critique() -> dict:
+    """Sample critique shared by the tests that only read it."""
+    return make_sample_critique()
+
+
+@pytest.fixture(scope="module")
+def succeeded_result(sample_critique: dict) -> dict:
+    """Succeeded API result for img_0001 wrapping the sample critique."""
+    return make_succeeded_result("img_0001", sample_critique)
+
+
 class TestParseCritique:
     """Tests for parse_critique function."""
 
-    def test_parse_succeeded_result(self) -> None:
+    def test_parse_succeeded_result(self, succeeded_result: dict) -> None:
         """Test parsing a succeeded result."""
-        critique = make_sample_critique()
-        result = make_succeeded_result("test_id", critique)
-        parsed = parse_critique(result)
+        parsed = parse_critique(succeeded_result)
 
         assert parsed is not None
         assert parsed["overall_score"] == 7.5
         assert parsed["composition_score"] == 8.0
 
-    def test_parse_with_markdown_code_blocks(self) -> None:
+    def test_parse_with_markdown_code_blocks(self, sample_critique: dict) -> None:
         """Test parsing JSON wrapped in markdown code blocks."""
-        critique = make_sample_critique()
         result = {
             "custom_id": "test_id",
             "result": {
@@ -75,7 +103,7 @@ class TestParseCritique:
                     "content": [
                         {
                             "type": "text",
-                            "text": f"```json\n{json.dumps(critique)}\n```",
+                            "text": f"```json\n{json.dumps(sample_critique)}\n```",
                         }
                     ]
                 },
@@ -85,6 +113,24 @@ class TestParseCritique:
         assert parsed is not None
         assert parsed["overall_score"] == 7.5
 
+    def test_parse_with_bare_code_fence(self) -> None:
+        """Test parsing JSON in a fence with no language tag."""
+        critique = make_sample_critique(6.0)
+        result = {
+            "custom_id": "test_id",
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "content": [
+                        {"type": "text", "text": f"  ```\n{json.dumps(critique)}```\n"}
+                    ]
+                },
+            },
+        }
+        parsed = parse_critique(result)
+        assert parsed is not None
+        assert parsed["overall_score"] == 6.0
+
     def test_parse_failed_result(self) -> None:
         """Test that failed results return None."""
         result = {
@@ -122,10 +168,9 @@ class TestParseCritique:
 class TestMergeResults:
     """Tests for merge_results function."""
 
-    def test_merge_single_result(self) -> None:
+    def test_merge_single_result(self, succeeded_result: dict) -> None:
         """Test merging a single result with metadata."""
-        critique = make_sample_critique()
-        batch_results = [make_succeeded_result("img_0001", critique)]
+        batch_results = [succeeded_result]
         metadata = [
             {
                 "custom_id": "img_0001",
@@ -142,11 +187,10 @@ class TestMergeResults:
         assert merged[0]["overall_score"] == 7.5
         assert merged[0]["original_dimensions"] == (1920, 1080)
 
-    def test_merge_skips_failed_results(self) -> None:
+    def test_merge_skips_failed_results(self, succeeded_result: dict) -> None:
         """Test that failed results are skipped."""
-        critique = make_sample_critique()
         batch_results = [
-            make_succeeded_result("img_0001", critique),
+            succeeded_result,
             {"custom_id": "img_0002", "result": {"type": "errored"}},
         ]
         metadata = [
@@ -158,16 +202,49 @@ class TestMergeResults:
         assert len(merged) == 1
         assert merged[0]["filename"] == "photo1.jpg"
 
-    def test_merge_missing_metadata(self) -> None:
+    def test_merge_missing_metadata(self, succeeded_result: dict) -> None:
         """Test merging when metadata is missing."""
-        critique = make_sample_critique()
-        batch_results = [make_succeeded_result("img_0001", critique)]
+        batch_results = [succeeded_result]
         metadata: list = []  # No matching metadata
 
         merged = merge_results(batch_results, metadata)
         assert len(merged) == 1
         assert merged[0]["filename"] == "unknown"
 
+    def test_merge_out_of_order_results(self) -> None:
+        """Test that results returned out of order still get their metadata."""
+        batch_results = [
+            make_succeeded_result("img_0002", make_sample_critique(6.0)),
+            make_succeeded_result("img_0001", make_sample_critique(8.0)),
+        ]
+        metadata = [
+            {"custom_id": "img_0001", "filename": "photo1.jpg", "path": "/p1"},
+            {"custom_id": "img_0002", "filename": "photo2.jpg", "path": "/p2"},
+        ]
+
+        merged = merge_results(batch_results, metadata)
+        assert [(m["filename"], m["overall_score"]) for m in merged] == [
+            ("photo2.jpg", 6.0),
+            ("photo1.jpg", 8.0),
+        ]
+
+    def test_merge_with_metadata_index(self, succeeded_result: dict) -> None:
+        """Test that a prebuilt metadata index is used for lookups."""
+        batch_results = [succeeded_result]
+        index = {"img_0001": {"custom_id": "img_0001", "filename": "indexed.jpg"}}
+
+        merged = merge_results(batch_results, [], metadata_index=index)
+        assert merged[0]["filename"] == "indexed.jpg"
+
+    def test_merge_defaults_missing_score(self) -> None:
+        """Test that critiques without an overall score get zero."""
+        critique = make_sample_critique()
+        del critique["overall_score"]
+        batch_results = [make_succeeded_result("img_0001", critique)]
+
+        merged = merge_results(batch_results, [])
+        assert merged[0]["overall_score"] == 0
+
 
 class TestFilterByScore:
     """Tests for filter_by_score function."""
@@ -281,6 +358,31 @@ class TestCalculateStatistics:
         assert stats["score_distribution"]["good (7-8)"] == 1
         assert stats["score_distribution"]["poor (0-5)"] == 1
 
+    def test_calculate_distribution_boundaries(self) -> None:
+        """Test tier edges and scores outside the 0-10 range."""
+        scores = [10.5, 9.0, 8.99, 6.0, 5.0, 4.99, -1.0]
+        results = [
+            {
+                "overall_score": s,
+                "composition_score": 5,
+                "lighting_score": 5,
+                "subject_score": 5,
+                "technical_score": 5,
+            }
+            for s in scores
+        ]
+
+        stats = calculate_statistics(results)
+
+        assert stats["score_distribution"] == {
+            "excellent (9-10)": 2,
+            "great (8-9)": 1,
+            "good (7-8)": 0,
+            "average (6-7)": 1,
+            "below_average (5-6)": 1,
+            "poor (0-5)": 2,
+        }
+
 
 class TestGenerateJsonReport:
     """Tests for generate_json_report function."""
@@ -301,9 +403,7 @@ class TestGenerateJsonReport:
 
         generate_json_report(results, output_path)
 
-        assert output_path.exists()
-        with open(output_path) as f:
-            report = json.load(f)
+        report = json_loads(read_report(output_path))
         assert "generated_at" in report
         assert "statistics" in report
         assert "results" in report
@@ -340,12 +440,36 @@ class TestGenerateJsonReport:
 
         generate_json_report(results, output_path)
 
-        with open(output_path) as f:
-            report = json.load(f)
+        report = json_loads(output_path.read_bytes())
         assert report["results"][0]["filename"] == "high.jpg"
         assert report["results"][1]["filename"] == "mid.jpg"
         assert report["results"][2]["filename"] == "low.jpg"
 
+    @pytest.mark.parametrize("count", [0, 3])
+    def test_generate_json_matches_whole_document(
+        self, tmp_path: Path, count: int
+    ) -> None:
+        """Test that the streamed report equals encoding it in one go."""
+        results = [
+            {**make_sample_critique(overall=score), "filename": f"{score}.jpg"}
+            for score in [6.0, 9.0, 7.5][:count]
+        ]
+        generated_at = datetime(2024, 1, 2, 3, 4, 5)
+        output_path = tmp_path / "report.json"
+
+        generate_json_report(results, output_path, generated_at=generated_at)
+
+        ordered = sorted(results, key=lambda r: r["overall_score"], reverse=True)
+        expected = json_dumps(
+            {
+                "generated_at": generated_at.isoformat(),
+                "statistics": calculate_statistics(ordered),
+                "results": ordered,
+            },
+            indent=True,
+        )
+        assert output_path.read_bytes() == expected
+
 
 class TestGenerateMarkdownReport:
     """Tests for generate_markdown_report function."""
@@ -374,20 +498,63 @@ class TestGenerateMarkdownReport:
 
         generate_markdown_report(results, output_path)
 
-        assert output_path.exists()
-        content = output_path.read_text()
+        content = read_report(output_path).decode("utf-8")
         assert "# Photo Critic Report" in content
         assert "test.jpg" in content
         assert "Great photo" in content
 
+    def test_generate_markdown_groups_and_orders_tiers(self, tmp_path: Path) -> None:
+        """Test that results appear under their tier, best first."""
+        scores = {"ok.jpg": 7.2, "best.jpg": 10.0, "weak.jpg": 3.0, "fine.jpg": 7.8}
+        results = [
+            {**make_sample_critique(overall=score), "filename": name, "path": name}
+            for name, score in scores.items()
+        ]
+        output_path = tmp_path / "report.md"
+
+        generate_markdown_report(results, output_path)
+
+        content = output_path.read_text()
+        positions = [
+            content.index(marker)
+            for marker in [
+                "### Excellent (9-10)",
+                "#### best.jpg",
+                "### Good (7-8)",
+                "#### fine.jpg",
+                "#### ok.jpg",
+                "### Poor (0-5)",
+                "#### weak.jpg",
+            ]
+        ]
+        assert positions == sorted(positions)
+        assert "### Great (8-9)" not in content
+
+    def test_generate_markdown_is_utf8(self, tmp_path: Path) -> None:
+        """Test that non-ASCII text is written as UTF-8."""
+        results = [
+            {
+                **make_sample_critique(),
+                "filename": "café.jpg",
+                "path": "/photos/café.jpg",
+                "summary": "Soft light — very calm",
+            }
+        ]
+        output_path = tmp_path / "report.md"
+
+        generate_markdown_report(results, output_path)
+
+        content = output_path.read_bytes().decode("utf-8")
+        assert "#### café.jpg" in content
+        assert "Soft light — very calm" in content
+
 
 class TestGenerateReport:
     """Tests for generate_report function."""
 
-    def test_generate_report_json(self, tmp_path: Path) -> None:
+    def test_generate_report_json(self, succeeded_result: dict, tmp_path: Path) -> None:
         """Test generating JSON format report."""
-        critique = make_sample_critique()
-        batch_results = [make_succeeded_result("img_0001", critique)]
+        batch_results = [succeeded_result]
         metadata = [{"custom_id": "img_0001", "filename": "test.jpg", "path": "/test"}]
         output_path = tmp_path / "report"
 
@@ -396,10 +563,11 @@ class TestGenerateReport:
         assert (tmp_path / "report.json").exists()
         assert not (tmp_path / "report.md").exists()
 
-    def test_generate_report_markdown(self, tmp_path: Path) -> None:
+    def test_generate_report_markdown(
+        self, succeeded_result: dict, tmp_path: Path
+    ) -> None:
         """Test generating Markdown format report."""
-        critique = make_sample_critique()
-        batch_results = [make_succeeded_result("img_0001", critique)]
+        batch_results = [succeeded_result]
         metadata = [{"custom_id": "img_0001", "filename": "test.jpg", "path": "/test"}]
         output_path = tmp_path / "report"
 
@@ -408,10 +576,9 @@ class TestGenerateReport:
         assert not (tmp_path / "report.json").exists()
         assert (tmp_path / "report.md").exists()
 
-    def test_generate_report_both(self, tmp_path: Path) -> None:
+    def test_generate_report_both(self, succeeded_result: dict, tmp_path: Path) -> None:
         """Test generating both formats."""
-        critique = make_sample_critique()
-        batch_results = [make_succeeded_result("img_0001", critique)]
+        batch_results = [succeeded_result]
         metadata = [{"custom_id": "img_0001", "filename": "test.jpg", "path": "/test"}]
         output_path = tmp_path / "report"
 
@@ -420,6 +587,43 @@ class TestGenerateReport:
         assert (tmp_path / "report.json").exists()
         assert (tmp_path / "report.md").exists()
 
+    def test_generate_report_both_computes_stats_once(
+        self,
+        succeeded_result: dict,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that both writers share one statistics pass."""
+        calls = []
+        original = report.calculate_statistics
+
+        def counting(results: list) -> dict:
+            calls.append(len(results))
+            return original(results)
+
+        monkeypatch.setattr(report, "calculate_statistics", counting)
+        batch_results = [succeeded_result]
+        metadata = [{"custom_id": "img_0001", "filename": "test.jpg", "path": "/test"}]
+
+        generate_report(batch_results, metadata, tmp_path / "report", format="both")
+
+        assert calls == [1]
+
+    def test_generate_report_both_share_timestamp(
+        self, succeeded_result: dict, tmp_path: Path
+    ) -> None:
+        """Test that both reports carry the same generation time."""
+        batch_results = [succeeded_result]
+        metadata = [{"custom_id": "img_0001", "filename": "test.jpg", "path": "/test"}]
+
+        generate_report(batch_results, metadata, tmp_path / "report", format="both")
+
+        generated_at = datetime.fromisoformat(
+            json_loads((tmp_path / "report.json").read_bytes())["generated_at"]
+        )
+        markdown = (tmp_path / "report.md").read_text()
+        assert f"**Generated:** {generated_at:%Y-%m-%d %H:%M:%S}" in markdown
+
     def test_generate_report_with_min_score(self, tmp_path: Path) -> None:
         """Test that min_score filter is applied."""
         high_critique = make_sample_critique(overall=9.0)
@@ -438,11 +642,25 @@ class TestGenerateReport:
             batch_results, metadata, output_path, format="json", min_score=7.0
         )
 
-        with open(tmp_path / "report.json") as f:
-            report = json.load(f)
+        report = json_loads((tmp_path / "report.json").read_bytes())
         assert len(report["results"]) == 1
         assert report["results"][0]["filename"] == "high.jpg"
 
+    def test_generate_report_with_top_k(self, tmp_path: Path) -> None:
+        """Test that only the best top_k results are kept, best first."""
+        scores = [6.0, 9.0, 7.5, 8.0]
+        batch_results = [
+            make_succeeded_result(f"img_{i}", make_sample_critique(overall=score))
+            for i, score in enumerate(scores)
+        ]
+        output_path = tmp_path / "report"
+
+        generate_report(batch_results, [], output_path, format="json", top_k=2)
+
+        report_data = json_loads((tmp_path / "report.json").read_bytes())
+        assert [r["overall_score"] for r in report_data["results"]] == [9.0, 8.0]
+        assert report_data["statistics"]["total_images"] == 2
+
     def test_generate_report_invalid_format(self, tmp_path: Path) -> None:
         """Test that invalid format raises ValueError."""
         with pytest.raises(ValueError, match="Invalid format"):